@@ -0,0 +1,113 @@
+"""
+Persistent TTL key-value cache for Deezer lookups.
+
+The in-memory TTLCache in DeezerEnrichment is wiped on every restart,
+so each deploy re-pays the full Deezer round trips. A single SQLite
+file (pooled via aiosqlitepool to avoid per-query connection overhead)
+survives within the instance lifetime and is shared across workers.
+"""
+
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Optional, Dict
+
+import aiosqlite
+import orjson
+from aiosqlitepool import SQLiteConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+class DeezerDiskCache:
+    """
+    Async SQLite-backed key-value store with per-entry expiry.
+
+    Values are stored as orjson-encoded BLOBs in a single `kv` table:
+        kv(k TEXT PRIMARY KEY, v BLOB, exp INTEGER)
+    """
+
+    def __init__(self, db_path, pool_size: int = 4):
+        self.db_path = Path(db_path)
+        self._pool: Optional[SQLiteConnectionPool] = None
+        self._pool_size = pool_size
+        self._init_lock = asyncio.Lock()
+
+    async def _connect(self) -> aiosqlite.Connection:
+        """Connection factory for the pool (WAL mode for concurrent readers)."""
+        conn = await aiosqlite.connect(self.db_path)
+        await conn.execute("PRAGMA journal_mode=WAL")
+        await conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    async def _ensure_pool(self) -> SQLiteConnectionPool:
+        """Create the pool and schema on first use."""
+        if self._pool is None:
+            async with self._init_lock:
+                if self._pool is None:
+                    self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                    pool = SQLiteConnectionPool(
+                        connection_factory=self._connect,
+                        pool_size=self._pool_size
+                    )
+                    async with pool.connection() as conn:
+                        await conn.execute(
+                            "CREATE TABLE IF NOT EXISTS kv ("
+                            "k TEXT PRIMARY KEY, v BLOB, exp INTEGER)"
+                        )
+                        await conn.commit()
+                    self._pool = pool
+                    logger.info(f"💾 Deezer disk cache ready: {self.db_path}")
+        return self._pool
+
+    async def get(self, key: str) -> Optional[Dict]:
+        """Return the cached value for key, or None if missing/expired."""
+        try:
+            pool = await self._ensure_pool()
+            async with pool.connection() as conn:
+                cursor = await conn.execute(
+                    "SELECT v FROM kv WHERE k = ? AND exp > ?",
+                    (key, int(time.time()))
+                )
+                row = await cursor.fetchone()
+
+            if row is None:
+                return None
+
+            return orjson.loads(row[0])
+
+        except Exception as e:
+            logger.debug(f"Deezer disk cache read error: {e}")
+            return None
+
+    async def set(self, key: str, value: Dict, ttl: int) -> None:
+        """Store value under key, expiring after ttl seconds."""
+        try:
+            pool = await self._ensure_pool()
+            async with pool.connection() as conn:
+                await conn.execute(
+                    "INSERT OR REPLACE INTO kv (k, v, exp) VALUES (?, ?, ?)",
+                    (key, orjson.dumps(value), int(time.time()) + ttl)
+                )
+                await conn.commit()
+
+        except Exception as e:
+            logger.debug(f"Deezer disk cache write error: {e}")
+
+    async def clear(self) -> None:
+        """Delete all entries."""
+        try:
+            pool = await self._ensure_pool()
+            async with pool.connection() as conn:
+                await conn.execute("DELETE FROM kv")
+                await conn.commit()
+
+        except Exception as e:
+            logger.debug(f"Deezer disk cache clear error: {e}")
+
+    async def close(self) -> None:
+        """Close the connection pool."""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
@@ -11,9 +11,14 @@ Based on: RetroMusicPlayer/app/.../network/DeezerService.kt
 
 import aiohttp
 import asyncio
+import orjson
 from typing import Optional, List, Dict
 import logging
 from urllib.parse import quote
+from cachetools import TTLCache
+
+from core.deezer_cache import DeezerDiskCache
+from config import CACHE_DIR
 
 logger = logging.getLogger(__name__)
 
@@ -28,16 +33,62 @@ class DeezerEnrichment:
     BASE_URL = "https://api.deezer.com"
     
     def __init__(self):
-        self.session = aiohttp.ClientSession(headers={
-            'User-Agent': 'RetroMusic-Server/1.0 (https://github.com/retromusic)',
-            'Accept': 'application/json'
-        })
-        self._cache: Dict[str, Dict] = {}  # artist_name -> artist_data
+        # Session is created lazily on first use so construction doesn't
+        # require a running event loop (and keep-alive connections persist
+        # for the process lifetime — closed via close() on app shutdown)
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._session_lock = asyncio.Lock()
+        self._sem = asyncio.Semaphore(10)  # cap concurrent Deezer requests
+        # Bounded caches: positive hits refresh hourly, misses retry after 10 min
+        self._cache = TTLCache(maxsize=2048, ttl=3600)  # artist_name -> artist_data
+        self._miss_cache = TTLCache(maxsize=1024, ttl=600)  # artist_name -> True (not found)
+        self._artist_detail_cache = TTLCache(maxsize=2048, ttl=3600)  # artist_id -> detail
+        self._album_genre_cache = TTLCache(maxsize=4096, ttl=3600)  # album_id -> set of genres
+        self._inflight: Dict[str, asyncio.Future] = {}  # cache_key -> pending search
+        # Disk layer survives restarts; cold-start hits skip Deezer entirely
+        self._disk_cache = DeezerDiskCache(CACHE_DIR / 'deezer.db')
     
     async def close(self):
-        """Close HTTP session"""
-        await self.session.close()
-    
+        """Close HTTP session and cache pool"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        await self._disk_cache.close()
+
+    async def _ensure_session(self):
+        """Create the shared ClientSession on first use (double-checked under lock)."""
+        if self.session is None or self.session.closed:
+            async with self._session_lock:
+                if self.session is None or self.session.closed:
+                    # Pooled connector (keep-alive + DNS cache) with per-host
+                    # limits so concurrent gathers don't trip Deezer rate limiting
+                    connector = aiohttp.TCPConnector(
+                        limit=20,
+                        limit_per_host=10,
+                        ttl_dns_cache=300,
+                        keepalive_timeout=60
+                    )
+                    self.session = aiohttp.ClientSession(connector=connector, headers={
+                        'User-Agent': 'RetroMusic-Server/1.0 (https://github.com/retromusic)',
+                        'Accept': 'application/json'
+                    })
+
+    async def _get_json(self, url: str, params: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        GET a Deezer endpoint and return parsed JSON.
+
+        All requests go through the semaphore so concurrent gathers can't
+        exceed the per-host connection budget. Returns None on non-200.
+        """
+        await self._ensure_session()
+        async with self._sem:
+            async with self.session.get(url, params=params, timeout=10) as response:
+                if response.status != 200:
+                    logger.warning(f"Deezer request failed ({response.status}): {url}")
+                    return None
+                # orjson parses the raw bytes ~3x faster than stdlib json
+                return orjson.loads(await response.read())
+
     async def get_artist_image(
         self, 
         artist_name: str,
@@ -90,35 +141,28 @@ class DeezerEnrichment:
             
             # Fetch full artist details (includes genres)
             artist_id = artist_data['id']
-            artist_url = f"{self.BASE_URL}/artist/{artist_id}"
-            
-            async with self.session.get(artist_url, timeout=10) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    # Extract genres (Deezer doesn't always provide this)
-                    # We'll use the artist's top albums to infer genres
-                    albums_url = f"{self.BASE_URL}/artist/{artist_id}/albums"
-                    async with self.session.get(albums_url, params={'limit': 5}, timeout=10) as albums_response:
-                        if albums_response.status == 200:
-                            albums_data = await albums_response.json()
-                            genres = set()
-                            
-                            for album in albums_data.get('data', [])[:5]:
-                                # Get album details to find genre
-                                album_id = album['id']
-                                album_url = f"{self.BASE_URL}/album/{album_id}"
-                                async with self.session.get(album_url, timeout=10) as album_response:
-                                    if album_response.status == 200:
-                                        album_data = await album_response.json()
-                                        if 'genres' in album_data:
-                                            for genre in album_data['genres'].get('data', []):
-                                                genres.add(genre['name'])
-                            
-                            if genres:
-                                genre_list = list(genres)
-                                logger.info(f"🎼 Deezer genres for {artist_name}: {', '.join(genre_list)}")
-                                return genre_list
+            data = await self._get_artist_detail(artist_id)
+            if data:
+                # Extract genres (Deezer doesn't always provide this)
+                # We'll use the artist's top albums to infer genres
+                albums_url = f"{self.BASE_URL}/artist/{artist_id}/albums"
+                albums_data = await self._get_json(albums_url, params={'limit': 5})
+                if albums_data:
+                    albums = albums_data.get('data', [])[:5]
+
+                    # Fetch all album details concurrently (one RTT instead of five)
+                    tasks = [self._fetch_album_genres(album['id']) for album in albums]
+                    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+                    genres = set()
+                    for result in results:
+                        if isinstance(result, set):
+                            genres |= result
+
+                    if genres:
+                        genre_list = list(genres)
+                        logger.info(f"🎼 Deezer genres for {artist_name}: {', '.join(genre_list)}")
+                        return genre_list
         
         except asyncio.TimeoutError:
             logger.warning(f"Deezer request timed out for {artist_name}")
@@ -127,6 +171,48 @@ class DeezerEnrichment:
         
         return []
     
+    async def _get_artist_detail(self, artist_id) -> Optional[Dict]:
+        """
+        Fetch full artist details (/artist/{id}), memoized per artist_id.
+
+        Shared by get_artist_genres and get_artist_info so the second
+        hop is only paid once per artist per TTL window.
+        """
+        if artist_id in self._artist_detail_cache:
+            logger.debug(f"Deezer artist detail cache hit for {artist_id}")
+            return self._artist_detail_cache[artist_id]
+
+        data = await self._get_json(f"{self.BASE_URL}/artist/{artist_id}")
+        if data:
+            self._artist_detail_cache[artist_id] = data
+        return data
+
+    async def _fetch_album_genres(self, album_id) -> set:
+        """
+        Fetch genre names for a single album, memoized per album_id.
+
+        Returns a set of genre names (empty on error).
+        """
+        if album_id in self._album_genre_cache:
+            return self._album_genre_cache[album_id]
+
+        genres = set()
+
+        try:
+            album_data = await self._get_json(f"{self.BASE_URL}/album/{album_id}")
+            if album_data and 'genres' in album_data:
+                for genre in album_data['genres'].get('data', []):
+                    genres.add(genre['name'])
+            if album_data is not None:
+                self._album_genre_cache[album_id] = genres
+
+        except asyncio.TimeoutError:
+            logger.debug(f"Deezer album {album_id} request timed out")
+        except Exception as e:
+            logger.debug(f"Deezer album {album_id} fetch error: {e}")
+
+        return genres
+
     async def get_artist_info(self, artist_name: str) -> Optional[Dict]:
         """
         Get comprehensive artist information from Deezer.
@@ -144,22 +230,18 @@ class DeezerEnrichment:
             
             # Fetch full artist details
             artist_id = artist_data['id']
-            artist_url = f"{self.BASE_URL}/artist/{artist_id}"
-            
-            async with self.session.get(artist_url, timeout=10) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    info = {
-                        'name': data.get('name'),
-                        'image_url': data.get('picture_xl') or data.get('picture_big'),
-                        'nb_fan': data.get('nb_fan', 0),
-                        'nb_album': data.get('nb_album', 0),
-                        'source': 'Deezer'
-                    }
-                    
-                    logger.info(f"✅ Deezer info for {artist_name}: {info['nb_fan']:,} fans, {info['nb_album']} albums")
-                    return info
+            data = await self._get_artist_detail(artist_id)
+            if data:
+                info = {
+                    'name': data.get('name'),
+                    'image_url': data.get('picture_xl') or data.get('picture_big'),
+                    'nb_fan': data.get('nb_fan', 0),
+                    'nb_album': data.get('nb_album', 0),
+                    'source': 'Deezer'
+                }
+
+                logger.info(f"✅ Deezer info for {artist_name}: {info['nb_fan']:,} fans, {info['nb_album']} albums")
+                return info
         
         except asyncio.TimeoutError:
             logger.warning(f"Deezer request timed out for {artist_name}")
@@ -189,27 +271,24 @@ class DeezerEnrichment:
             # Search for album
             search_query = f"{artist_name} {album_name}"
             search_url = f"{self.BASE_URL}/search/album"
-            params = {'q': search_query, 'limit': 5}
-            
-            async with self.session.get(search_url, params=params, timeout=10) as response:
-                if response.status != 200:
-                    return None
-                
-                data = await response.json()
-                results = data.get('data', [])
-                
-                if not results:
-                    logger.debug(f"Deezer: No album found for {artist_name} - {album_name}")
-                    return None
-                
-                # Find best match (first result is usually best)
-                album = results[0]
-                size_key = f'cover_{size}'
-                cover_url = album.get(size_key) or album.get('cover_big')
-                
-                if cover_url:
-                    logger.info(f"🖼️ Deezer album cover found: {album_name} ({size})")
-                    return cover_url
+            data = await self._get_json(search_url, params={'q': search_query, 'limit': 5})
+            if not data:
+                return None
+
+            results = data.get('data', [])
+
+            if not results:
+                logger.debug(f"Deezer: No album found for {artist_name} - {album_name}")
+                return None
+
+            # Find best match (first result is usually best)
+            album = results[0]
+            size_key = f'cover_{size}'
+            cover_url = album.get(size_key) or album.get('cover_big')
+
+            if cover_url:
+                logger.info(f"🖼️ Deezer album cover found: {album_name} ({size})")
+                return cover_url
         
         except asyncio.TimeoutError:
             logger.warning(f"Deezer request timed out for {album_name}")
@@ -218,6 +297,31 @@ class DeezerEnrichment:
         
         return None
     
+    async def search_artists_bulk(self, names: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Search many artists concurrently (playlist enrichment).
+
+        Deduplicates the input and fires all lookups through
+        _search_artist, so cached names cost nothing and the rest run in
+        parallel under the shared semaphore instead of one round trip at
+        a time.
+
+        Args:
+            names: Artist names (duplicates fine)
+
+        Returns:
+            Dict mapping each unique input name to its artist data (or None)
+        """
+        unique = list(dict.fromkeys(names))  # dedupe, keep order
+        results = await asyncio.gather(
+            *[self._search_artist(name) for name in unique],
+            return_exceptions=True
+        )
+        return {
+            name: (result if isinstance(result, dict) else None)
+            for name, result in zip(unique, results)
+        }
+
     async def _search_artist(self, artist_name: str) -> Optional[Dict]:
         """
         Search for artist on Deezer.
@@ -225,35 +329,66 @@ class DeezerEnrichment:
         Returns artist data dict or None.
         Caches results to avoid redundant API calls.
         """
-        # Check cache first
-        if artist_name in self._cache:
+        # Check caches first (keys normalized so "Radiohead" and "radiohead " share an entry)
+        cache_key = artist_name.strip().casefold()
+        if cache_key in self._cache:
             logger.debug(f"Deezer cache hit for {artist_name}")
-            return self._cache[artist_name]
-        
+            return self._cache[cache_key]
+
+        if cache_key in self._miss_cache:
+            logger.debug(f"Deezer miss-cache hit for {artist_name}")
+            return None
+
+        # Coalesce concurrent lookups for the same artist into one request
+        if cache_key in self._inflight:
+            logger.debug(f"Deezer search already in flight for {artist_name}")
+            return await self._inflight[cache_key]
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = fut
+        try:
+            artist_data = await self._do_search_artist(artist_name, cache_key)
+            fut.set_result(artist_data)
+            return artist_data
+        finally:
+            # If this (leader) task was cancelled, the future was never
+            # resolved — cancel it so waiters don't hang forever
+            if not fut.done():
+                fut.cancel()
+            del self._inflight[cache_key]
+
+    async def _do_search_artist(self, artist_name: str, cache_key: str) -> Optional[Dict]:
+        """Perform the actual Deezer artist search (no cache/in-flight checks)."""
         try:
+            # Disk cache (survives restarts) before hitting the network
+            disk_hit = await self._disk_cache.get(f"artist:{cache_key}")
+            if disk_hit is not None:
+                logger.debug(f"Deezer disk cache hit for {artist_name}")
+                self._cache[cache_key] = disk_hit
+                return disk_hit
+
             search_url = f"{self.BASE_URL}/search/artist"
-            params = {'q': artist_name, 'limit': 5}
-            
-            async with self.session.get(search_url, params=params, timeout=10) as response:
-                if response.status != 200:
-                    logger.warning(f"Deezer search failed: {response.status}")
-                    return None
-                
-                data = await response.json()
-                results = data.get('data', [])
-                
-                if not results:
-                    logger.debug(f"Deezer: No artist found for {artist_name}")
-                    return None
-                
-                # Return first result (usually best match)
-                artist_data = results[0]
-                
-                # Cache result
-                self._cache[artist_name] = artist_data
-                
-                logger.debug(f"Deezer: Found artist '{artist_data['name']}' for query '{artist_name}'")
-                return artist_data
+            # limit=1: only results[0] is ever used, so don't pay for 5x the bytes
+            data = await self._get_json(search_url, params={'q': artist_name, 'limit': 1})
+            if not data:
+                return None
+
+            results = data.get('data', [])
+
+            if not results:
+                logger.debug(f"Deezer: No artist found for {artist_name}")
+                self._miss_cache[cache_key] = True
+                return None
+
+            # Return first result (usually best match)
+            artist_data = results[0]
+
+            # Cache result (write-through to disk for restart survival)
+            self._cache[cache_key] = artist_data
+            await self._disk_cache.set(f"artist:{cache_key}", artist_data, ttl=7 * 86400)
+
+            logger.debug(f"Deezer: Found artist '{artist_data['name']}' for query '{artist_name}'")
+            return artist_data
         
         except asyncio.TimeoutError:
             logger.warning(f"Deezer search timed out for {artist_name}")
@@ -265,4 +400,7 @@ class DeezerEnrichment:
     def clear_cache(self):
         """Clear artist cache"""
         self._cache.clear()
+        self._miss_cache.clear()
+        self._artist_detail_cache.clear()
+        self._album_genre_cache.clear()
         logger.info("🧹 Deezer cache cleared")
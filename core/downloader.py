@@ -3,11 +3,17 @@ Main downloader orchestrator.
 Combines Spotify metadata + YouTube search + yt-dlp download + metadata writing.
 """
 
+import asyncio
 import logging
 import os
 import shutil
+import sys
+import threading
+import unicodedata
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional, Callable
+from cachetools import TTLCache
 from yt_dlp import YoutubeDL
 
 from core.spotify_client import SpotifyClient
@@ -18,6 +24,12 @@ from config import OUTPUT_DIR, CACHE_DIR
 
 logger = logging.getLogger(__name__)
 
+# syncedlyrics runs a synchronous HTTP cascade across several providers;
+# bound the worker threads so parallel downloads don't pile them up, and
+# cache results so re-downloads skip the providers entirely
+_LYRICS_SEM = asyncio.Semaphore(4)
+_LYRICS_CACHE = TTLCache(maxsize=2048, ttl=86400)  # (title, artists) -> lyrics
+
 
 class TrackDownloader:
     """
@@ -48,14 +60,22 @@ class TrackDownloader:
         self.youtube = youtube_searcher or YouTubeMusicSearcher()
         self.metadata_writer = metadata_writer or MetadataWriter()
         self.pytube_downloader = PyTubeDownloader()  # Add PyTube downloader
-        
-        # Ensure output directory exists
-        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-        CACHE_DIR.mkdir(parents=True, exist_ok=True)
-        
+
+        # Spotify responses for a track_id are effectively immutable, so
+        # retries and re-requests skip the API round trip for a day
+        self._meta_cache = TTLCache(maxsize=4096, ttl=86400)
+
+        # Persistent yt-dlp instances (built lazily on first fallback
+        # use). YoutubeDL isn't thread-safe, so each worker thread keeps
+        # its own pool and progress hook — concurrent downloads never
+        # share an instance and never serialize on each other
+        self._ydl_local = threading.local()
+
+        # OUTPUT_DIR/CACHE_DIR are created once at config import time
+
         logger.info("✅ Track downloader initialized")
     
-    def download_track(
+    async def download_track(
         self,
         track_id: str,
         progress_callback: Optional[Callable[[int, str], None]] = None,
@@ -63,22 +83,32 @@ class TrackDownloader:
     ) -> Optional[Path]:
         """
         Download a track by Spotify ID.
-        
+
+        Blocking network/disk work (Spotify API, YouTube search, yt-dlp,
+        metadata writing) is offloaded to worker threads so the event loop
+        stays responsive while a download runs.
+
         Args:
             track_id: Spotify track ID
             progress_callback: Optional callback(percent: int, message: str)
             include_lyrics: Whether to fetch and embed lyrics
-            
+
         Returns:
             Path to downloaded file, or None if failed
         """
         try:
             logger.info(f"📥 Starting download: {track_id}")
-            
+
             # Step 1: Fetch Spotify metadata (0-20%)
             self._report_progress(progress_callback, 5, "Fetching Spotify metadata...")
-            metadata = self.spotify.get_track_metadata(track_id)
-            
+            metadata = self._meta_cache.get(track_id)
+            if metadata is None:
+                metadata = await asyncio.to_thread(self.spotify.get_track_metadata, track_id)
+                if metadata:
+                    self._meta_cache[track_id] = metadata
+            else:
+                logger.debug(f"Spotify metadata cache hit for {track_id}")
+
             if not metadata:
                 logger.error("❌ Failed to fetch Spotify metadata")
                 self._report_progress(progress_callback, 0, "Failed: Could not fetch metadata")
@@ -90,7 +120,8 @@ class TrackDownloader:
             # Step 2: Search YouTube Music (20-40%)
             self._report_progress(progress_callback, 25, "Searching YouTube Music...")
             
-            youtube_result = self.youtube.search(
+            youtube_result = await asyncio.to_thread(
+                self.youtube.search,
                 track_name=metadata['title'],
                 artist_name=', '.join(metadata['artists']),
                 duration_seconds=metadata['duration_ms'] // 1000
@@ -104,40 +135,59 @@ class TrackDownloader:
             logger.info(f"🎬 Found video: {youtube_result['title']} (score: {youtube_result['score']})")
             self._report_progress(progress_callback, 40, f"Found YouTube match (score: {youtube_result['score']})")
             
-            # Step 3: Download audio (40-80%)
+            # Steps 3+4: Download audio (40-80%) and fetch lyrics concurrently.
+            # Lyrics come from a different provider than the audio, so the
+            # lookup rides along with the (much slower) download for free.
             self._report_progress(progress_callback, 45, "Downloading audio...")
-            
-            audio_file = self._download_audio(
+
+            # Build the final album directory up front so the audio streams
+            # straight into place — skips a second full-file write to move
+            # it out of the cache afterwards
+            artist = metadata['artists'][0] if metadata['artists'] else 'Unknown Artist'
+            album = metadata['album'] or 'Unknown Album'
+            album_dir = OUTPUT_DIR / self._sanitize_filename(artist) / self._sanitize_filename(album)
+            album_dir.mkdir(parents=True, exist_ok=True)
+            track_num = metadata.get('track_number', 1)
+            final_stem = f"{track_num:02d} - {self._sanitize_filename(metadata['title'])}"
+
+            download_task = asyncio.create_task(asyncio.to_thread(
+                self._download_audio,
                 youtube_url=youtube_result['url'],
                 track_name=metadata['title'],
                 artist_name=metadata['artists'][0],
-                progress_callback=progress_callback
-            )
-            
+                progress_callback=progress_callback,
+                output_dir=album_dir,
+                filename=final_stem
+            ))
+
+            lyrics_task = None
+            if include_lyrics:
+                lyrics_task = asyncio.create_task(
+                    self._fetch_lyrics(metadata)
+                )
+
+            audio_file = await download_task
+
             if not audio_file:
+                if lyrics_task:
+                    lyrics_task.cancel()
                 logger.error("❌ Audio download failed")
                 self._report_progress(progress_callback, 0, "Failed: Download error")
                 return None
-            
+
             logger.info(f"📦 Downloaded: {audio_file.name}")
             self._report_progress(progress_callback, 80, "Audio downloaded")
-            
-            # Step 4: Fetch lyrics (optional, 80-85%)
+
+            # Collect lyrics result (usually finished long before the audio)
             lyrics = None
-            if include_lyrics:
+            if lyrics_task:
                 self._report_progress(progress_callback, 82, "Fetching lyrics...")
-                try:
-                    from syncedlyrics import search
-                    lyrics = search(f"{metadata['title']} {', '.join(metadata['artists'])}")
-                    if lyrics:
-                        logger.info("📄 Lyrics found")
-                except Exception as e:
-                    logger.warning(f"⚠️ Lyrics fetch failed: {e}")
-            
+                lyrics = await lyrics_task
+
             # Step 5: Write metadata (85-95%)
             self._report_progress(progress_callback, 85, "Writing metadata...")
             
-            if not self.metadata_writer.write_metadata(audio_file, metadata, lyrics):
+            if not await asyncio.to_thread(self.metadata_writer.write_metadata, audio_file, metadata, lyrics):
                 logger.error("❌ Metadata writing failed")
                 self._report_progress(progress_callback, 0, "Failed: Metadata error")
                 return None
@@ -148,7 +198,7 @@ class TrackDownloader:
             # Step 6: Move to output directory (95-100%)
             self._report_progress(progress_callback, 97, "Finalizing...")
             
-            final_path = self._move_to_output(audio_file, metadata)
+            final_path = await asyncio.to_thread(self._move_to_output, audio_file, metadata)
             
             if not final_path:
                 logger.error("❌ Failed to move file to output")
@@ -165,32 +215,65 @@ class TrackDownloader:
             self._report_progress(progress_callback, 0, f"Failed: {str(e)}")
             return None
     
+    async def _fetch_lyrics(self, metadata: Dict[str, Any]) -> Optional[str]:
+        """
+        Fetch synced lyrics for a track (worker thread, errors swallowed).
+
+        Args:
+            metadata: Track metadata from Spotify
+
+        Returns:
+            LRC lyrics string or None
+        """
+        cache_key = (metadata['title'], ', '.join(metadata['artists']))
+        if cache_key in _LYRICS_CACHE:
+            logger.debug(f"Lyrics cache hit for {cache_key[0]}")
+            return _LYRICS_CACHE[cache_key]
+
+        try:
+            from syncedlyrics import search
+            async with _LYRICS_SEM:
+                lyrics = await asyncio.to_thread(
+                    search, f"{cache_key[0]} {cache_key[1]}"
+                )
+            if lyrics:
+                logger.info("📄 Lyrics found")
+                _LYRICS_CACHE[cache_key] = lyrics
+            return lyrics
+        except Exception as e:
+            logger.warning(f"⚠️ Lyrics fetch failed: {e}")
+            return None
+
     def _download_audio(
         self,
         youtube_url: str,
         track_name: str,
         artist_name: str,
-        progress_callback: Optional[Callable[[int, str], None]]
+        progress_callback: Optional[Callable[[int, str], None]],
+        output_dir: Optional[Path] = None,
+        filename: Optional[str] = None
     ) -> Optional[Path]:
         """
         Download audio from YouTube using multiple methods.
-        
+
         Tries in order:
         1. PyTubefix (most reliable, works with current YouTube)
         2. yt-dlp with iOS client
         3. yt-dlp with browser cookies
-        
+
         Args:
             youtube_url: YouTube video URL
             track_name: Track name for filename
             artist_name: Artist name for filename
             progress_callback: Progress callback
-            
+            output_dir: Target directory (defaults to CACHE_DIR)
+            filename: Filename stem to use (defaults to "Artist - Track")
+
         Returns:
-            Path to downloaded file in cache
+            Path to downloaded file
         """
-        # Sanitize filename
-        safe_filename = self._sanitize_filename(f"{artist_name} - {track_name}")
+        target_dir = output_dir or CACHE_DIR
+        safe_filename = filename or self._sanitize_filename(f"{artist_name} - {track_name}")
         
         # Method 1: Try PyTubefix first (most reliable)
         try:
@@ -199,37 +282,23 @@ class TrackDownloader:
             
             downloaded_file = self.pytube_downloader.download_audio(
                 youtube_url=youtube_url,
-                output_path=CACHE_DIR,
+                output_path=target_dir,
                 filename=safe_filename,
                 progress_callback=lambda percent, msg: self._report_progress(progress_callback, percent, msg)
             )
             
             if downloaded_file and downloaded_file.exists():
                 logger.info(f"✅ Download successful with: PyTubefix")
-                
-                # Convert MP4 to M4A if needed using ffmpeg
+
+                # PyTubefix's audio-only MP4 streams are already AAC, and
+                # M4A is just MP4-with-AAC — a rename changes the container
+                # label without spawning ffmpeg or rewriting the file
                 if downloaded_file.suffix == '.mp4':
                     m4a_file = downloaded_file.with_suffix('.m4a')
-                    try:
-                        import subprocess
-                        subprocess.run([
-                            'ffmpeg', '-i', str(downloaded_file),
-                            '-c:a', 'copy',  # Copy audio codec (no re-encoding)
-                            '-y',  # Overwrite
-                            str(m4a_file)
-                        ], check=True, capture_output=True)
-                        
-                        # Remove original MP4
-                        downloaded_file.unlink()
-                        downloaded_file = m4a_file
-                        logger.info("✅ Converted MP4 to M4A")
-                    except Exception as e:
-                        logger.warning(f"⚠️ Failed to convert to M4A, using MP4: {e}")
-                        # Rename to m4a anyway (M4A and MP4 with AAC are compatible)
-                        m4a_file = downloaded_file.with_suffix('.m4a')
-                        downloaded_file.rename(m4a_file)
-                        downloaded_file = m4a_file
-                
+                    downloaded_file.rename(m4a_file)
+                    downloaded_file = m4a_file
+                    logger.info("✅ Renamed MP4 to M4A (AAC stream, no remux needed)")
+
                 return downloaded_file
             else:
                 logger.warning("⚠️ PyTubefix - file not found after download")
@@ -241,7 +310,7 @@ class TrackDownloader:
         # Method 2: Try yt-dlp methods as fallback
         logger.info("🔄 PyTubefix failed, trying yt-dlp fallback methods...")
         
-        output_template = str(CACHE_DIR / f"{safe_filename}.%(ext)s")
+        output_template = str(target_dir / f"{safe_filename}.%(ext)s")
         
         # yt-dlp progress hook
         def progress_hook(d):
@@ -259,86 +328,100 @@ class TrackDownloader:
             elif d['status'] == 'finished':
                 self._report_progress(progress_callback, 80, "Processing audio...")
         
-        # Base options
+        # Try yt-dlp methods (one persistent YoutubeDL per strategy,
+        # kept per worker thread so concurrent downloads run in
+        # parallel; per-call outtmpl/progress hook set just below)
+        ydl_pool = self._get_ydl_pool()
+        self._ydl_local.hook = progress_hook
+
+        try:
+            for method_name, ydl in ydl_pool:
+                try:
+                    logger.info(f"🔄 Trying download method: {method_name}")
+
+                    ydl.params['outtmpl']['default'] = output_template
+                    ydl.download([youtube_url])
+
+                    # Find downloaded file
+                    downloaded_file = target_dir / f"{safe_filename}.m4a"
+
+                    if downloaded_file.exists():
+                        logger.info(f"✅ Download successful with: {method_name}")
+                        return downloaded_file
+                    else:
+                        logger.warning(f"⚠️ File not found after download: {method_name}")
+
+                except Exception as e:
+                    error_msg = str(e)
+
+                    # Check if it's a 403 error
+                    if '403' in error_msg or 'Forbidden' in error_msg:
+                        logger.warning(f"⚠️ {method_name} failed with 403 - trying next method")
+                        continue
+                    # Check if cookies not found (expected for some browsers)
+                    elif 'cookie' in error_msg.lower() and 'not found' in error_msg.lower():
+                        logger.warning(f"⚠️ {method_name} - browser not found, skipping")
+                        continue
+                    else:
+                        logger.error(f"❌ {method_name} failed: {error_msg}")
+                        continue
+        finally:
+            self._ydl_local.hook = None
+
+        # All methods failed
+        logger.error(f"❌ All download methods failed")
+        return None
+
+    def _get_ydl_pool(self):
+        """Get the calling thread's yt-dlp pool, building it on first use."""
+        pool = getattr(self._ydl_local, 'pool', None)
+        if pool is None:
+            pool = self._build_ydl_pool()
+            self._ydl_local.pool = pool
+        return pool
+
+    def _build_ydl_pool(self):
+        """
+        Construct one persistent YoutubeDL instance per fallback strategy.
+
+        Building YoutubeDL re-parses options and warms the extractor
+        registry every time; keeping the instances around (per thread)
+        amortizes that across batch downloads. Per-call state (output
+        template, progress callback) is injected before each .download().
+
+        Returns:
+            List of (method_name, YoutubeDL) pairs in fallback order.
+        """
         base_opts = {
             'format': 'bestaudio/best',
-            'outtmpl': output_template,
             'postprocessors': [{
                 'key': 'FFmpegExtractAudio',
                 'preferredcodec': 'm4a',  # M4A for better quality
             }],
             'quiet': True,
             'no_warnings': True,
-            'progress_hooks': [progress_hook],
+            'progress_hooks': [self._forward_ydl_progress],
         }
-        
-        # Try yt-dlp methods
-        download_methods = [
-            {
-                'name': 'Mobile web client (yt-dlp)',
-                'opts': {
-                    **base_opts,
-                    'extractor_args': {'youtube': {'player_client': ['mweb', 'web']}},
-                }
-            },
-            {
-                'name': 'iOS client (yt-dlp)',
-                'opts': {
-                    **base_opts,
-                    'extractor_args': {'youtube': {'player_client': ['ios']}},
-                }
-            },
-            {
-                'name': 'Android client (yt-dlp)',
-                'opts': {
-                    **base_opts,
-                    'extractor_args': {'youtube': {'player_client': ['android']}},
-                }
-            },
-            {
-                'name': 'Browser cookies - Edge (yt-dlp)',
-                'opts': {
-                    **base_opts,
-                    'cookiesfrombrowser': ('edge',),
-                    'extractor_args': {'youtube': {'player_client': ['mweb']}},
-                }
-            },
+
+        strategies = [
+            ('Mobile web client (yt-dlp)',
+             {'extractor_args': {'youtube': {'player_client': ['mweb', 'web']}}}),
+            ('iOS client (yt-dlp)',
+             {'extractor_args': {'youtube': {'player_client': ['ios']}}}),
+            ('Android client (yt-dlp)',
+             {'extractor_args': {'youtube': {'player_client': ['android']}}}),
+            ('Browser cookies - Edge (yt-dlp)',
+             {'cookiesfrombrowser': ('edge',),
+              'extractor_args': {'youtube': {'player_client': ['mweb']}}}),
         ]
-        
-        for method in download_methods:
-            try:
-                logger.info(f"🔄 Trying download method: {method['name']}")
-                
-                with YoutubeDL(method['opts']) as ydl:
-                    ydl.download([youtube_url])
-                
-                # Find downloaded file
-                downloaded_file = CACHE_DIR / f"{safe_filename}.m4a"
-                
-                if downloaded_file.exists():
-                    logger.info(f"✅ Download successful with: {method['name']}")
-                    return downloaded_file
-                else:
-                    logger.warning(f"⚠️ File not found after download: {method['name']}")
-                    
-            except Exception as e:
-                error_msg = str(e)
-                
-                # Check if it's a 403 error
-                if '403' in error_msg or 'Forbidden' in error_msg:
-                    logger.warning(f"⚠️ {method['name']} failed with 403 - trying next method")
-                    continue
-                # Check if cookies not found (expected for some browsers)
-                elif 'cookie' in error_msg.lower() and 'not found' in error_msg.lower():
-                    logger.warning(f"⚠️ {method['name']} - browser not found, skipping")
-                    continue
-                else:
-                    logger.error(f"❌ {method['name']} failed: {error_msg}")
-                    continue
-        
-        # All methods failed
-        logger.error(f"❌ All download methods failed")
-        return None
+
+        return [(name, YoutubeDL({**base_opts, **extra})) for name, extra in strategies]
+
+    def _forward_ydl_progress(self, d):
+        """Permanent yt-dlp hook that forwards to this thread's callback."""
+        hook = getattr(self._ydl_local, 'hook', None)
+        if hook:
+            hook(d)
     
     def _move_to_output(self, audio_file: Path, metadata: Dict[str, Any]) -> Optional[Path]:
         """
@@ -352,54 +435,68 @@ class TrackDownloader:
             Final path in output directory
         """
         try:
-            # Create artist/album directory structure
+            # Create artist/album directory structure. Pure string ops via
+            # os.path (cheaper than Path objects in the per-track hot loop);
+            # directory names are interned since albums repeat them per track
             artist = metadata['artists'][0] if metadata['artists'] else 'Unknown Artist'
             album = metadata['album'] or 'Unknown Album'
-            
-            artist_dir = OUTPUT_DIR / self._sanitize_filename(artist)
-            album_dir = artist_dir / self._sanitize_filename(album)
-            album_dir.mkdir(parents=True, exist_ok=True)
-            
+
+            artist_s = sys.intern(self._sanitize_filename(artist))
+            album_s = sys.intern(self._sanitize_filename(album))
+            album_dir = os.path.join(str(OUTPUT_DIR), artist_s, album_s)
+            os.makedirs(album_dir, exist_ok=True)
+
             # Build filename: "01 - Track Name.m4a"
             track_num = metadata.get('track_number', 1)
             track_name = metadata['title']
-            filename = f"{track_num:02d} - {self._sanitize_filename(track_name)}{audio_file.suffix}"
-            
-            final_path = album_dir / filename
-            
-            # Move file
-            shutil.move(str(audio_file), str(final_path))
-            
+            src = str(audio_file)
+            suffix = os.path.splitext(src)[1]
+            filename = f"{track_num:02d} - {self._sanitize_filename(track_name)}{suffix}"
+
+            final_path = os.path.join(album_dir, filename)
+
+            # Already downloaded straight into place — nothing to move
+            if src == final_path:
+                return Path(final_path)
+
+            # Move file — atomic single-syscall rename when cache and output
+            # share a filesystem (the common case); copy+delete only across devices
+            try:
+                os.replace(src, final_path)
+            except OSError:
+                shutil.move(src, final_path)
+
             logger.info(f"📁 Moved to: {final_path}")
-            return final_path
-            
+            return Path(final_path)
+
         except Exception as e:
             logger.error(f"❌ File move failed: {e}", exc_info=True)
             return None
     
-    def _sanitize_filename(self, filename: str) -> str:
+    # Translation table built once: strips all filesystem-invalid chars
+    # in a single C-level pass instead of nine str.replace passes
+    _SANITIZE_TABLE = str.maketrans('', '', '<>:"/\\|?*')
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _sanitize_filename(filename: str) -> str:
         """
         Sanitize filename for filesystem.
-        
+
+        Memoized: album downloads sanitize the same artist/album names
+        once per track, so repeats become a single dict lookup.
+
         Args:
             filename: Filename to sanitize
-            
+
         Returns:
             Safe filename
         """
-        # Remove invalid characters
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, '')
-        
-        # Remove leading/trailing dots and spaces
-        filename = filename.strip('. ')
-        
-        # Limit length
-        if len(filename) > 200:
-            filename = filename[:200]
-        
-        return filename
+        # Normalize lookalike Unicode (fullwidth colons etc.) before stripping
+        filename = unicodedata.normalize('NFKC', filename)
+
+        # Remove invalid characters, leading/trailing dots and spaces, cap length
+        return filename.translate(TrackDownloader._SANITIZE_TABLE).strip('. ')[:200]
     
     def _report_progress(
         self,
@@ -9,15 +9,17 @@ Based on: RetroMusicPlayer/app/.../spotify/scraper/KworbScraper.kt
 """
 
 import aiohttp
-from bs4 import BeautifulSoup
+from aiolimiter import AsyncLimiter
+from selectolax.parser import HTMLParser
 import asyncio
-from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, Dict
 import logging
-import hashlib
-import json
-import difflib
+import re
+import sqlite3
+import time
+
+from rapidfuzz import fuzz, process
 
 logger = logging.getLogger(__name__)
 
@@ -36,21 +38,71 @@ class KworbScraper:
     # Caching to minimize requests
     CACHE_DURATION_DAYS = 7
     RATE_LIMIT_SECONDS = 5
+
+    # Strips thousands separators in one C-level pass (no copy via .replace)
+    _NO_COMMAS = str.maketrans('', '', ',')
+
+    # Compiled once: one substitution pass replaces four str.replace scans
+    _NOISE_RE = re.compile(
+        r'\((?:official\s+(?:audio|video))\)|\bhq\b|\bofficial\b',
+        re.IGNORECASE
+    )
     
-    def __init__(self, cache_dir: str = "./cache/kworb"):
+    def __init__(
+        self,
+        cache_dir: str = "./cache/kworb",
+        session: Optional[aiohttp.ClientSession] = None
+    ):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        
-        self.session: Optional[aiohttp.ClientSession] = None
-        self._rate_limit_lock = asyncio.Lock()
-        self._last_request_time = 0.0
-        
+
+        # One SQLite DB instead of a JSON file per track: at scale the
+        # per-file open/read/close and inode churn dwarf the lookup itself.
+        # WAL mode keeps reads non-blocking; expiry is a WHERE clause.
+        self._db = sqlite3.connect(self.cache_dir / 'kworb.db', isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS streams ("
+            "spotify_id TEXT PRIMARY KEY, total INTEGER, daily INTEGER, ts INTEGER)"
+        )
+        # HTTP validators per page so expired entries can be revalidated
+        # with a bodyless 304 instead of a full re-download + parse
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT)"
+        )
+        # Working page URL per artist so later tracks by the same artist
+        # skip straight to it instead of probing both slug patterns
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS artist_urls ("
+            "artist TEXT PRIMARY KEY, url TEXT)"
+        )
+
+        # Optionally share one app-wide pooled session with the other
+        # enrichment clients so connections are reused across modules
+        self.session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
+        # Token bucket: concurrent scrapes share the rate budget without
+        # serializing each other's parse/match work behind a global lock
+        self._limiter = AsyncLimiter(1, self.RATE_LIMIT_SECONDS)
+
         logger.info("✅ Kworb scraper initialized")
     
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create aiohttp session"""
         if self.session is None or self.session.closed:
+            # Pooled connector with keep-alive and DNS caching — both URL
+            # patterns hit the same host, so the second request reuses the
+            # first connection instead of re-handshaking
+            connector = aiohttp.TCPConnector(
+                limit=10,
+                limit_per_host=5,
+                ttl_dns_cache=300,
+                enable_cleanup_closed=True
+            )
             self.session = aiohttp.ClientSession(
+                connector=connector,
                 headers={
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
                 }
@@ -58,9 +110,10 @@ class KworbScraper:
         return self.session
     
     async def close(self):
-        """Close aiohttp session"""
-        if self.session and not self.session.closed:
+        """Close aiohttp session (if owned) and cache DB"""
+        if self._owns_session and self.session and not self.session.closed:
             await self.session.close()
+        self._db.close()
     
     async def get_track_streams(
         self,
@@ -94,7 +147,7 @@ class KworbScraper:
         logger.info(f"📊 Fetching Kworb stats for {track_name} by {artist_name}")
         
         try:
-            streams = await self._scrape_streams(track_name, artist_name)
+            streams = await self._scrape_streams(track_name, artist_name, spotify_id)
             
             if streams:
                 # Cache result
@@ -112,36 +165,30 @@ class KworbScraper:
     async def _scrape_streams(
         self,
         track_name: str,
-        artist_name: str
+        artist_name: str,
+        spotify_id: Optional[str] = None
     ) -> Optional[Dict[str, int]]:
         """
         Scrape Kworb.net for stream statistics.
-        
+
         Args:
             track_name: Track name
             artist_name: Artist name
-            
+            spotify_id: Spotify track ID (enables 304 revalidation of an
+                expired cache entry via stored ETag/Last-Modified)
+
         Returns:
             Stream statistics or None
         """
-        # Rate limiting
-        async with self._rate_limit_lock:
-            now = asyncio.get_event_loop().time()
-            time_since_last = now - self._last_request_time
-            
-            if time_since_last < self.RATE_LIMIT_SECONDS:
-                wait_time = self.RATE_LIMIT_SECONDS - time_since_last
-                logger.info(f"⏳ Kworb rate limit: waiting {wait_time:.1f}s")
-                await asyncio.sleep(wait_time)
-            
-            self._last_request_time = asyncio.get_event_loop().time()
-        
         # Kworb URL for artist's tracks
         # Format: https://kworb.net/spotify/artist/{artist_id}.html
         # We'll search by artist name first
         
         session = await self._get_session()
-        
+
+        # Normalize the query once — not per table row
+        norm_query = self._normalize(track_name)
+
         # Clean artist name for URL
         artist_slug = artist_name.lower().replace(' ', '_').replace('&', 'and')
         artist_slug = ''.join(c for c in artist_slug if c.isalnum() or c == '_')
@@ -151,127 +198,234 @@ class KworbScraper:
             f"https://kworb.net/spotify/artist/{artist_slug}.html",
             f"https://kworb.net/spotify/artist/{artist_name.replace(' ', '_')}.html"
         ]
-        
+
+        # Lead with the URL that worked last time for this artist, and
+        # de-dup — one-word artists make both patterns identical, and each
+        # duplicate costs a round trip plus a 5s rate-limit wait
+        known_url = self._get_artist_url(artist_name)
+        if known_url:
+            urls.insert(0, known_url)
+        urls = list(dict.fromkeys(urls))
+
+        # Expired entry we could revalidate without re-downloading the page
+        stale = self._get_stale_streams(spotify_id) if spotify_id else None
+
         for url in urls:
             try:
-                async with session.get(url, timeout=10) as response:
+                # Only send validators when there's a stale row to refresh —
+                # a 304 carries no body, so there's nothing else to parse
+                headers = self._get_validators(url) if stale else None
+
+                # Rate-limit only the fetch itself (1 request / RATE_LIMIT_SECONDS)
+                async with self._limiter, session.get(url, timeout=10, headers=headers) as response:
+                    if response.status == 304:
+                        logger.info(f"📊 Kworb page unchanged (304) — revalidated cache for {track_name}")
+                        self._touch_cached(spotify_id)
+                        return stale
+
                     if response.status != 200:
                         continue
-                    
+
                     html = await response.text()
-                    soup = BeautifulSoup(html, 'lxml')
-                    
-                    # Find table rows
-                    table = soup.find('table')
-                    if not table:
+                    self._store_validators(url, response)
+
+                    # Kworb sometimes serves a 200 error shell with no chart;
+                    # a substring probe is far cheaper than parsing ~100KB
+                    # of HTML just to find out there's no table
+                    if '<table' not in html:
                         continue
-                    
-                    rows = table.find_all('tr')
-                    
-                    # Search for matching track
+
+                    # selectolax's C parser returns the cell text directly
+                    # with no per-node Python object allocation
+                    tree = HTMLParser(html)
+
+                    rows = tree.css('table tr')
+                    if not rows:
+                        continue
+
+                    # Column structure (typical):
+                    # 0: Rank
+                    # 1: Track name (with link)
+                    # 2: Total plays
+                    # 3: Daily plays
+
+                    # Collect candidates in one pass, then let rapidfuzz
+                    # scan the whole list in C instead of scoring row by
+                    # row from Python
+                    choices = []
+                    stats = []
                     for row in rows[1:]:  # Skip header
-                        cols = row.find_all('td')
-                        if len(cols) < 4:
+                        tds = row.css('td')
+                        if len(tds) < 4:
                             continue
-                        
-                        # Column structure (typical):
-                        # 0: Rank
-                        # 1: Track name (with link)
-                        # 2: Total plays
-                        # 3: Daily plays
-                        
-                        row_track_name = cols[1].get_text(strip=True)
-                        
-                        # Fuzzy match track name
-                        if self._fuzzy_match(track_name, row_track_name, threshold=0.7):
-                            # Extract numbers
-                            total_plays_str = cols[2].get_text(strip=True).replace(',', '')
-                            daily_plays_str = cols[3].get_text(strip=True).replace(',', '')
-                            
-                            try:
-                                total_plays = int(total_plays_str)
-                                daily_plays = int(daily_plays_str) if daily_plays_str.isdigit() else 0
-                                
-                                return {
-                                    'total_plays': total_plays,
-                                    'daily_plays': daily_plays
-                                }
-                            except ValueError:
-                                continue
-                
+                        choices.append(tds[1].text(strip=True))
+                        stats.append((tds[2].text(strip=True), tds[3].text(strip=True)))
+
+                    if not choices:
+                        continue
+
+                    norm_choices = [self._normalize(c) for c in choices]
+
+                    # Exact-match fast path: clean metadata usually matches a
+                    # row verbatim, and a hash probe is O(1) vs an O(N)
+                    # edit-distance scan over the whole table
+                    idx = {c: i for i, c in enumerate(norm_choices)}.get(norm_query)
+
+                    if idx is None:
+                        match = process.extractOne(
+                            norm_query,
+                            norm_choices,
+                            scorer=fuzz.WRatio,
+                            score_cutoff=70
+                        )
+                        if not match:
+                            continue
+                        idx = match[2]
+
+                    # Extract numbers for the best-matching row
+                    total_plays_str, daily_plays_str = stats[idx]
+                    total_plays_str = total_plays_str.translate(self._NO_COMMAS)
+                    daily_plays_str = daily_plays_str.translate(self._NO_COMMAS)
+
+                    try:
+                        streams = {
+                            'total_plays': int(total_plays_str),
+                            'daily_plays': int(daily_plays_str) if daily_plays_str.isdigit() else 0
+                        }
+                    except ValueError:
+                        continue
+
+                    # Remember which URL pattern worked for this artist
+                    self._store_artist_url(artist_name, url)
+                    return streams
+
             except Exception as e:
                 logger.debug(f"Kworb URL failed: {url} - {e}")
                 continue
         
         return None
     
-    def _fuzzy_match(self, str1: str, str2: str, threshold: float = 0.8) -> bool:
-        """
-        Fuzzy string matching.
-        
-        Args:
-            str1: First string
-            str2: Second string
-            threshold: Similarity threshold (0-1)
-            
-        Returns:
-            True if strings match above threshold
-        """
-        # Normalize strings
-        s1 = str1.lower().strip()
-        s2 = str2.lower().strip()
-        
-        # Remove common noise
-        for noise in ['(official audio)', '(official video)', 'hq', 'official']:
-            s1 = s1.replace(noise, '').strip()
-            s2 = s2.replace(noise, '').strip()
-        
-        # Calculate similarity
-        ratio = difflib.SequenceMatcher(None, s1, s2).ratio()
-        
-        return ratio >= threshold
-    
+    def _normalize(self, s: str) -> str:
+        """Lowercase and strip common noise markers for fuzzy comparison."""
+        return self._NOISE_RE.sub('', s).lower().strip()
+
     def _get_cached_streams(self, spotify_id: str) -> Optional[Dict[str, int]]:
         """Get cached stream statistics if not expired"""
-        cache_file = self.cache_dir / f"{spotify_id}.json"
-        
-        if not cache_file.exists():
+        try:
+            cutoff = int(time.time()) - self.CACHE_DURATION_DAYS * 86400
+            row = self._db.execute(
+                "SELECT total, daily FROM streams WHERE spotify_id = ? AND ts > ?",
+                (spotify_id, cutoff)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            return {
+                'total_plays': row[0],
+                'daily_plays': row[1]
+            }
+
+        except Exception as e:
+            logger.debug(f"Kworb cache read error: {e}")
             return None
-        
+
+    def _get_stale_streams(self, spotify_id: str) -> Optional[Dict[str, int]]:
+        """Get a cached entry regardless of expiry (304 revalidation candidate)"""
         try:
-            with open(cache_file, 'r') as f:
-                data = json.load(f)
-            
-            # Check expiration
-            cached_time = datetime.fromisoformat(data['timestamp'])
-            age = datetime.now() - cached_time
-            
-            if age > timedelta(days=self.CACHE_DURATION_DAYS):
-                logger.debug(f"Kworb cache expired for {spotify_id}")
-                cache_file.unlink()  # Delete expired cache
+            row = self._db.execute(
+                "SELECT total, daily FROM streams WHERE spotify_id = ?",
+                (spotify_id,)
+            ).fetchone()
+
+            if row is None:
                 return None
-            
+
             return {
-                'total_plays': data['total_plays'],
-                'daily_plays': data['daily_plays']
+                'total_plays': row[0],
+                'daily_plays': row[1]
             }
-            
+
         except Exception as e:
             logger.debug(f"Kworb cache read error: {e}")
             return None
-    
+
+    def _touch_cached(self, spotify_id: str):
+        """Refresh the timestamp on a revalidated cache entry"""
+        try:
+            self._db.execute(
+                "UPDATE streams SET ts = ? WHERE spotify_id = ?",
+                (int(time.time()), spotify_id)
+            )
+        except Exception as e:
+            logger.debug(f"Kworb cache touch error: {e}")
+
+    def _get_artist_url(self, artist_name: str) -> Optional[str]:
+        """Get the page URL that last worked for this artist"""
+        try:
+            row = self._db.execute(
+                "SELECT url FROM artist_urls WHERE artist = ?",
+                (artist_name.casefold(),)
+            ).fetchone()
+            return row[0] if row else None
+        except Exception as e:
+            logger.debug(f"Kworb artist URL read error: {e}")
+            return None
+
+    def _store_artist_url(self, artist_name: str, url: str):
+        """Remember the page URL that produced a successful scrape"""
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO artist_urls (artist, url) VALUES (?, ?)",
+                (artist_name.casefold(), url)
+            )
+        except Exception as e:
+            logger.debug(f"Kworb artist URL write error: {e}")
+
+    def _get_validators(self, url: str) -> Optional[Dict[str, str]]:
+        """Build If-None-Match / If-Modified-Since headers for a conditional GET"""
+        try:
+            row = self._db.execute(
+                "SELECT etag, last_modified FROM pages WHERE url = ?",
+                (url,)
+            ).fetchone()
+        except Exception as e:
+            logger.debug(f"Kworb validator read error: {e}")
+            return None
+
+        if row is None:
+            return None
+
+        headers = {}
+        if row[0]:
+            headers['If-None-Match'] = row[0]
+        if row[1]:
+            headers['If-Modified-Since'] = row[1]
+        return headers or None
+
+    def _store_validators(self, url: str, response):
+        """Persist ETag/Last-Modified from a fresh page download"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+
+        if not etag and not last_modified:
+            return
+
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified) VALUES (?, ?, ?)",
+                (url, etag, last_modified)
+            )
+        except Exception as e:
+            logger.debug(f"Kworb validator write error: {e}")
+
     def _cache_streams(self, spotify_id: str, streams: Dict[str, int]):
         """Cache stream statistics with timestamp"""
-        cache_file = self.cache_dir / f"{spotify_id}.json"
-        
-        data = {
-            'total_plays': streams['total_plays'],
-            'daily_plays': streams['daily_plays'],
-            'timestamp': datetime.now().isoformat()
-        }
-        
         try:
-            with open(cache_file, 'w') as f:
-                json.dump(data, f)
+            self._db.execute(
+                "INSERT OR REPLACE INTO streams (spotify_id, total, daily, ts) "
+                "VALUES (?, ?, ?, ?)",
+                (spotify_id, streams['total_plays'], streams['daily_plays'], int(time.time()))
+            )
         except Exception as e:
             logger.debug(f"Kworb cache write error: {e}")
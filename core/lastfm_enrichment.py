@@ -14,11 +14,21 @@ API: https://www.last.fm/api
 
 import aiohttp
 import asyncio
+import orjson
 from typing import Optional, Tuple, List, Dict
 import logging
 
+from cachetools import TTLCache
+
+import diskcache
+
+from config import CACHE_DIR
+
 logger = logging.getLogger(__name__)
 
+# Distinguishes "not in the disk cache" from a cached negative result
+_ABSENT = object()
+
 
 class LastFmEnrichment:
     """
@@ -31,17 +41,99 @@ class LastFmEnrichment:
     API_KEY = "c679c8d3efa84613dc7dcb2e8d42da4c"
     BASE_URL = "https://ws.audioscrobbler.com/2.0/"
     
-    def __init__(self):
-        self.session = aiohttp.ClientSession(headers={
-            'User-Agent': 'RetroMusic-Server/1.0 (https://github.com/retromusic)',
-            'Accept': 'application/json'
-        })
-        self._cache: Dict[str, any] = {}
-    
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        # Optionally share one app-wide pooled session with the other
+        # enrichment clients; otherwise build our own pooled connector
+        # (keep-alive + DNS cache so back-to-back API calls reuse
+        # connections instead of re-handshaking per request)
+        self._owns_session = session is None
+        if session is not None:
+            self.session = session
+        else:
+            connector = aiohttp.TCPConnector(
+                limit=50,
+                limit_per_host=10,
+                ttl_dns_cache=300,
+                enable_cleanup_closed=True
+            )
+            self.session = aiohttp.ClientSession(connector=connector, headers={
+                'User-Agent': 'RetroMusic-Server/1.0 (https://github.com/retromusic)',
+                'Accept': 'application/json'
+            })
+        # Invariant query params, built once instead of per request
+        self._base_params = {'api_key': self.API_KEY, 'format': 'json'}
+        # Last.fm refuses connections under heavy concurrency — bound it
+        self._sem = asyncio.BoundedSemaphore(20)
+        # Bounded working set: long-running processes no longer grow an
+        # unbounded dict (disk layer below keeps the long tail)
+        self._cache = TTLCache(maxsize=10_000, ttl=3600)
+        self._inflight: Dict[str, asyncio.Future] = {}  # cache_key -> pending fetch
+        # Persistent layer: survives restarts so redeploys don't re-pay
+        # the Last.fm round trips that dominate enrichment latency
+        self._disk_cache = diskcache.Cache(
+            str(CACHE_DIR / 'lastfm'),
+            size_limit=100 * 1024 * 1024
+        )
+
     async def close(self):
-        """Close HTTP session"""
-        await self.session.close()
-    
+        """Close HTTP session (if owned) and disk cache"""
+        if self._owns_session:
+            await self.session.close()
+        self._disk_cache.close()
+
+    def _from_disk(self, key: str):
+        """Read from the persistent layer. Returns _ABSENT on miss/error."""
+        try:
+            return self._disk_cache.get(key, default=_ABSENT)
+        except Exception as e:
+            logger.debug(f"Last.fm disk cache read error: {e}")
+            return _ABSENT
+
+    def _to_disk(self, key: str, value) -> None:
+        """
+        Write-through to the persistent layer.
+
+        Positive results keep for a week; negative results (None / [])
+        expire after an hour so misses eventually retry the API without
+        thrashing it in the meantime.
+        """
+        try:
+            expire = 7 * 86400 if value else 3600
+            self._disk_cache.set(key, value, expire=expire)
+        except Exception as e:
+            logger.debug(f"Last.fm disk cache write error: {e}")
+
+    async def _single_flight(self, cache_key: str, fetch):
+        """
+        Check the disk cache, then run `fetch()` unless an identical
+        lookup is already in flight, in which case await its result.
+
+        Shared by all the get_* methods so the disk-promotion and
+        request-coalescing logic lives in one place.
+        """
+        disk_val = self._from_disk(cache_key)
+        if disk_val is not _ABSENT:
+            logger.debug(f"Last.fm disk cache hit for {cache_key}")
+            self._cache[cache_key] = disk_val
+            return disk_val
+
+        existing = self._inflight.get(cache_key)
+        if existing is not None:
+            return await existing
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = fut
+        try:
+            result = await fetch()
+            fut.set_result(result)
+            return result
+        finally:
+            # If this (leader) task was cancelled, the future was never
+            # resolved — cancel it so waiters don't hang forever
+            if not fut.done():
+                fut.cancel()
+            del self._inflight[cache_key]
+
     async def get_artist_stats(self, artist_name: str) -> Optional[Tuple[int, int]]:
         """
         Get artist statistics from Last.fm.
@@ -56,24 +148,27 @@ class LastFmEnrichment:
         if cache_key in self._cache:
             logger.debug(f"Last.fm cache hit for artist stats: {artist_name}")
             return self._cache[cache_key]
-        
+
+        return await self._single_flight(
+            cache_key,
+            lambda: self._fetch_artist_stats(artist_name, cache_key)
+        )
+
+    async def _fetch_artist_stats(self, artist_name, cache_key: str) -> Optional[Tuple[int, int]]:
+        """Perform the artist.getInfo request (no cache/in-flight checks)."""
         try:
-            params = {
-                'method': 'artist.getInfo',
-                'artist': artist_name,
-                'api_key': self.API_KEY,
-                'format': 'json'
-            }
+            params = {**self._base_params, 'method': 'artist.getInfo', 'artist': artist_name}
             
-            async with self.session.get(self.BASE_URL, params=params, timeout=10) as response:
+            async with self._sem, self.session.get(self.BASE_URL, params=params, timeout=10) as response:
                 if response.status != 200:
                     logger.warning(f"Last.fm artist request failed: {response.status}")
                     return None
                 
-                data = await response.json()
+                data = await response.json(loads=orjson.loads, content_type=None)
                 
                 if 'error' in data:
                     logger.debug(f"Last.fm: Artist not found: {artist_name}")
+                    self._to_disk(cache_key, None)
                     return None
                 
                 artist = data.get('artist', {})
@@ -84,9 +179,10 @@ class LastFmEnrichment:
                 
                 result = (listeners, playcount)
                 
-                # Cache result
+                # Cache result (write-through to disk)
                 self._cache[cache_key] = result
-                
+                self._to_disk(cache_key, result)
+
                 logger.info(f"📊 Last.fm artist stats: {artist_name} - {listeners:,} listeners, {playcount:,} plays")
                 return result
         
@@ -116,25 +212,32 @@ class LastFmEnrichment:
         if cache_key in self._cache:
             logger.debug(f"Last.fm cache hit for track stats: {track_name}")
             return self._cache[cache_key]
-        
+
+        return await self._single_flight(
+            cache_key,
+            lambda: self._fetch_track_stats(track_name, artist_name, cache_key)
+        )
+
+    async def _fetch_track_stats(self, track_name, artist_name, cache_key: str) -> Optional[Tuple[int, int]]:
+        """Perform the track.getInfo request (no cache/in-flight checks)."""
         try:
             params = {
+                **self._base_params,
                 'method': 'track.getInfo',
                 'track': track_name,
-                'artist': artist_name,
-                'api_key': self.API_KEY,
-                'format': 'json'
+                'artist': artist_name
             }
             
-            async with self.session.get(self.BASE_URL, params=params, timeout=10) as response:
+            async with self._sem, self.session.get(self.BASE_URL, params=params, timeout=10) as response:
                 if response.status != 200:
                     logger.warning(f"Last.fm track request failed: {response.status}")
                     return None
                 
-                data = await response.json()
+                data = await response.json(loads=orjson.loads, content_type=None)
                 
                 if 'error' in data:
                     logger.debug(f"Last.fm: Track not found: {artist_name} - {track_name}")
+                    self._to_disk(cache_key, None)
                     return None
                 
                 track = data.get('track', {})
@@ -145,9 +248,10 @@ class LastFmEnrichment:
                 
                 result = (listeners, playcount)
                 
-                # Cache result
+                # Cache result (write-through to disk)
                 self._cache[cache_key] = result
-                
+                self._to_disk(cache_key, result)
+
                 logger.info(f"📊 Last.fm track stats: {track_name} - {listeners:,} listeners, {playcount:,} plays")
                 return result
         
@@ -172,24 +276,27 @@ class LastFmEnrichment:
         if cache_key in self._cache:
             logger.debug(f"Last.fm cache hit for artist genres: {artist_name}")
             return self._cache[cache_key]
-        
+
+        return await self._single_flight(
+            cache_key,
+            lambda: self._fetch_artist_genres(artist_name, cache_key)
+        )
+
+    async def _fetch_artist_genres(self, artist_name, cache_key: str) -> List[str]:
+        """Perform the artist.getTopTags request (no cache/in-flight checks)."""
         try:
-            params = {
-                'method': 'artist.getTopTags',
-                'artist': artist_name,
-                'api_key': self.API_KEY,
-                'format': 'json'
-            }
+            params = {**self._base_params, 'method': 'artist.getTopTags', 'artist': artist_name}
             
-            async with self.session.get(self.BASE_URL, params=params, timeout=10) as response:
+            async with self._sem, self.session.get(self.BASE_URL, params=params, timeout=10) as response:
                 if response.status != 200:
                     logger.warning(f"Last.fm artist tags request failed: {response.status}")
                     return []
                 
-                data = await response.json()
+                data = await response.json(loads=orjson.loads, content_type=None)
                 
                 if 'error' in data:
                     logger.debug(f"Last.fm: No tags for artist: {artist_name}")
+                    self._to_disk(cache_key, [])
                     return []
                 
                 toptags = data.get('toptags', {})
@@ -201,8 +308,9 @@ class LastFmEnrichment:
                     if isinstance(tag, dict) and 'name' in tag:
                         genres.append(tag['name'])
                 
-                # Cache result
+                # Cache result (write-through to disk)
                 self._cache[cache_key] = genres
+                self._to_disk(cache_key, genres)
                 
                 if genres:
                     logger.info(f"🎼 Last.fm genres for {artist_name}: {', '.join(genres[:5])}")
@@ -235,25 +343,32 @@ class LastFmEnrichment:
         if cache_key in self._cache:
             logger.debug(f"Last.fm cache hit for track tags: {track_name}")
             return self._cache[cache_key]
-        
+
+        return await self._single_flight(
+            cache_key,
+            lambda: self._fetch_track_tags(track_name, artist_name, cache_key)
+        )
+
+    async def _fetch_track_tags(self, track_name, artist_name, cache_key: str) -> List[str]:
+        """Perform the track.getTopTags request (no cache/in-flight checks)."""
         try:
             params = {
+                **self._base_params,
                 'method': 'track.getTopTags',
                 'track': track_name,
-                'artist': artist_name,
-                'api_key': self.API_KEY,
-                'format': 'json'
+                'artist': artist_name
             }
             
-            async with self.session.get(self.BASE_URL, params=params, timeout=10) as response:
+            async with self._sem, self.session.get(self.BASE_URL, params=params, timeout=10) as response:
                 if response.status != 200:
                     logger.warning(f"Last.fm track tags request failed: {response.status}")
                     return []
                 
-                data = await response.json()
+                data = await response.json(loads=orjson.loads, content_type=None)
                 
                 if 'error' in data:
                     logger.debug(f"Last.fm: No tags for track: {track_name}")
+                    self._to_disk(cache_key, [])
                     return []
                 
                 toptags = data.get('toptags', {})
@@ -265,8 +380,9 @@ class LastFmEnrichment:
                     if isinstance(tag, dict) and 'name' in tag:
                         tag_names.append(tag['name'])
                 
-                # Cache result
+                # Cache result (write-through to disk)
                 self._cache[cache_key] = tag_names
+                self._to_disk(cache_key, tag_names)
                 
                 if tag_names:
                     logger.info(f"🎼 Last.fm tags for {track_name}: {', '.join(tag_names)}")
@@ -280,6 +396,41 @@ class LastFmEnrichment:
         
         return []
     
+    async def get_track_bundle(
+        self,
+        tracks: List[Tuple[str, str]]
+    ) -> List[Dict[str, any]]:
+        """
+        Fetch stats and tags for a batch of tracks concurrently.
+
+        Instead of awaiting one request per track, every track.getInfo
+        and track.getTopTags call is launched at once and gathered — the
+        shared semaphore keeps the fan-out within Last.fm's comfort zone,
+        so wall time is ~1 RTT instead of len(tracks) x RTT.
+
+        Args:
+            tracks: List of (track_name, artist_name) pairs
+
+        Returns:
+            List (same order as input) of dicts:
+            {'stats': (listeners, playcount) or None, 'tags': [tag, ...]}
+        """
+        tasks = []
+        for track_name, artist_name in tracks:
+            tasks.append(self.get_track_stats(track_name, artist_name))
+            tasks.append(self.get_track_tags(track_name, artist_name))
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        bundles = []
+        for i in range(0, len(results), 2):
+            stats, tags = results[i], results[i + 1]
+            bundles.append({
+                'stats': stats if isinstance(stats, tuple) else None,
+                'tags': tags if isinstance(tags, list) else []
+            })
+        return bundles
+
     async def get_similar_artists(
         self, 
         artist_name: str,
@@ -295,21 +446,35 @@ class LastFmEnrichment:
         Returns:
             List of dicts with 'name' and 'match' (similarity score 0-1)
         """
+        # Cached under the largest limit seen so far; smaller requests
+        # just slice the stored list instead of refetching
+        cache_key = f"similar_{artist_name}"
+
+        cached = self._cache.get(cache_key)
+        if cached is None:
+            disk_val = self._from_disk(cache_key)
+            if disk_val is not _ABSENT:
+                self._cache[cache_key] = disk_val
+                cached = disk_val
+
+        if cached is not None and cached[0] >= limit:
+            logger.debug(f"Last.fm cache hit for similar artists: {artist_name}")
+            return cached[1][:limit]
+
         try:
             params = {
+                **self._base_params,
                 'method': 'artist.getSimilar',
                 'artist': artist_name,
-                'api_key': self.API_KEY,
-                'format': 'json',
                 'limit': limit
             }
             
-            async with self.session.get(self.BASE_URL, params=params, timeout=10) as response:
+            async with self._sem, self.session.get(self.BASE_URL, params=params, timeout=10) as response:
                 if response.status != 200:
                     logger.warning(f"Last.fm similar artists request failed: {response.status}")
                     return []
                 
-                data = await response.json()
+                data = await response.json(loads=orjson.loads, content_type=None)
                 
                 if 'error' in data:
                     logger.debug(f"Last.fm: No similar artists for: {artist_name}")
@@ -325,9 +490,13 @@ class LastFmEnrichment:
                             'match': float(artist.get('match', 0))
                         })
                 
+                # Cache result (write-through to disk; empty lists stay
+                # memory-only so the short TTL lets them retry)
+                self._cache[cache_key] = (limit, results)
                 if results:
+                    self._to_disk(cache_key, (limit, results))
                     logger.info(f"🎭 Last.fm similar artists for {artist_name}: {', '.join(r['name'] for r in results[:3])}")
-                
+
                 return results
         
         except asyncio.TimeoutError:
@@ -13,14 +13,32 @@ Based on:
 
 import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
-from typing import Optional, Dict
+import hashlib
+import orjson
+import sqlite3
+import time
+from selectolax.lexbor import LexborHTMLParser
+from typing import Optional, Dict, List, Tuple
 import logging
+import random
 import re
 from urllib.parse import quote
 
+from config import CACHE_DIR
+
 logger = logging.getLogger(__name__)
 
+# Compiled once at import — clean_lyrics runs on every fetched lyric
+_MULTI_NEWLINE_RE = re.compile(r'\n{3,}')
+_CR_TABLE = str.maketrans('', '', '\r')
+
+# Sentinel for a cached "no provider had lyrics" result
+_NEGATIVE = object()
+
+# Provider answered definitively that it has no lyrics for the track —
+# distinct from None, which means the attempt errored or timed out
+_MISS = object()
+
 
 class LyricsFetcher:
     """
@@ -30,22 +48,131 @@ class LyricsFetcher:
     LRCLIB_API = "https://lrclib.net/api"
     GENIUS_API = "https://api.genius.com"
     MUSIXMATCH_SEARCH = "https://www.musixmatch.com/search"
-    
-    def __init__(self, genius_token: Optional[str] = None):
+
+    # Found lyrics rarely change; misses are retried sooner in case a
+    # provider gains the track later
+    CACHE_TTL_SECONDS = 30 * 86400
+    NEGATIVE_TTL_SECONDS = 86400
+
+    def __init__(
+        self,
+        genius_token: Optional[str] = None,
+        session: Optional[aiohttp.ClientSession] = None
+    ):
         """
         Initialize lyrics fetcher.
-        
+
+        The HTTP session is created lazily on first use (or eagerly via
+        the `create()` factory), so the fetcher can be constructed
+        before any event loop is running.
+
         Args:
             genius_token: Optional Genius API token (for better rate limits)
+            session: Optional shared aiohttp session
         """
         self.genius_token = genius_token
-        self.session = aiohttp.ClientSession(headers={
-            'User-Agent': 'RetroMusic-Server/1.0 (https://github.com/retromusic)'
-        })
-    
+        self.session = session
+        self._owns_session = session is None
+
+        # Persistent cache: repeat queries (UI re-scrolls, library
+        # re-scans) skip the providers entirely
+        self._db = sqlite3.connect(
+            str(CACHE_DIR / 'lyrics_cache.db'),
+            isolation_level=None
+        )
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            'key TEXT PRIMARY KEY, lyrics TEXT, synced INTEGER, '
+            'source TEXT, ts INTEGER)'
+        )
+
+    @classmethod
+    async def create(cls, genius_token: Optional[str] = None) -> 'LyricsFetcher':
+        """
+        Build a LyricsFetcher with its pooled HTTP session pre-created.
+
+        Equivalent to constructing directly — the session would be built
+        lazily on first fetch — but front-loads connector setup to
+        startup.
+        """
+        fetcher = cls(genius_token=genius_token)
+        await fetcher._ensure_session()
+        return fetcher
+
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        """
+        Lazily create the pooled HTTP session inside the running loop.
+
+        The connector caps total and per-host connections and caches DNS
+        so batch workloads reuse warm connections instead of paying a
+        TCP+TLS handshake per lookup.
+        """
+        if self.session is None:
+            connector = aiohttp.TCPConnector(
+                limit=64,
+                limit_per_host=8,
+                ttl_dns_cache=300,
+                keepalive_timeout=60
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers={
+                    'User-Agent': 'RetroMusic-Server/1.0 (https://github.com/retromusic)'
+                },
+                timeout=aiohttp.ClientTimeout(total=15)
+            )
+        return self.session
+
+    async def __aenter__(self) -> 'LyricsFetcher':
+        await self._ensure_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
     async def close(self):
-        """Close HTTP session"""
-        await self.session.close()
+        """Close HTTP session (only if owned by this fetcher)"""
+        if self.session and self._owns_session:
+            await self.session.close()
+        self._db.close()
+
+    @staticmethod
+    def _cache_key(track: str, artist: str, duration: Optional[int]) -> str:
+        raw = f"{artist.lower()}|{track.lower()}|{duration or ''}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _cache_get(self, key: str):
+        """Return a cached result dict, _NEGATIVE for a fresh miss, or None"""
+        row = self._db.execute(
+            'SELECT lyrics, synced, source, ts FROM cache WHERE key = ?',
+            (key,)
+        ).fetchone()
+        if not row:
+            return None
+
+        lyrics, synced, source, ts = row
+        age = time.time() - ts
+
+        if lyrics is None:
+            return _NEGATIVE if age < self.NEGATIVE_TTL_SECONDS else None
+
+        if age < self.CACHE_TTL_SECONDS:
+            return {'lyrics': lyrics, 'synced': bool(synced), 'source': source}
+        return None
+
+    def _cache_put(self, key: str, result: Optional[Dict]):
+        if result:
+            values = (key, result['lyrics'], int(result['synced']),
+                      result['source'], int(time.time()))
+        else:
+            values = (key, None, 0, None, int(time.time()))
+        self._db.execute(
+            'INSERT OR REPLACE INTO cache (key, lyrics, synced, source, ts) '
+            'VALUES (?, ?, ?, ?, ?)',
+            values
+        )
     
     async def fetch_lyrics(
         self, 
@@ -69,51 +196,144 @@ class LyricsFetcher:
             Dict with keys: 'lyrics' (text), 'synced' (bool), 'source' (provider name)
             Returns None if no lyrics found
         """
-        logger.info(f"🎵 Fetching lyrics for: {artist_name} - {track_name}")
-        
-        # Try LrcLib first (best for synced lyrics)
-        if prefer_synced:
-            lrclib_result = await self._fetch_from_lrclib(
-                track_name, 
-                artist_name, 
-                album_name, 
-                duration_seconds
-            )
-            if lrclib_result:
-                logger.info(f"✅ Lyrics found on LrcLib (synced: {lrclib_result['synced']})")
-                return lrclib_result
-        
-        # Try Genius (good quality plain text)
+        logger.info("🎵 Fetching lyrics for: %s - %s", artist_name, track_name)
+
+        cache_key = self._cache_key(track_name, artist_name, duration_seconds)
+        cached = self._cache_get(cache_key)
+        if cached is _NEGATIVE:
+            logger.info("💾 Cached miss, skipping providers")
+            return None
+        if cached is not None:
+            logger.info("💾 Lyrics cache hit (%s)", cached['source'])
+            return cached
+
+        # Query all providers concurrently and take the first acceptable
+        # result instead of chaining sequential round-trips
+        tasks = [
+            asyncio.create_task(self._fetch_from_lrclib(
+                track_name,
+                artist_name,
+                album_name,
+                duration_seconds,
+                accept_plain=True
+            ))
+        ]
         if self.genius_token:
-            genius_result = await self._fetch_from_genius(track_name, artist_name)
-            if genius_result:
-                logger.info("✅ Lyrics found on Genius")
-                return genius_result
+            tasks.append(asyncio.create_task(
+                self._fetch_from_genius(track_name, artist_name)
+            ))
         else:
             logger.debug("⚠️ Genius token not provided, skipping Genius")
-        
-        # Try Musixmatch as last resort
-        musixmatch_result = await self._fetch_from_musixmatch(track_name, artist_name)
-        if musixmatch_result:
-            logger.info("✅ Lyrics found on Musixmatch")
-            return musixmatch_result
-        
-        # If prefer_synced=True and we didn't find synced, try LrcLib for plain text
-        if prefer_synced:
-            lrclib_plain = await self._fetch_from_lrclib(
-                track_name, 
-                artist_name, 
-                album_name, 
-                duration_seconds,
-                accept_plain=True
-            )
-            if lrclib_plain:
-                logger.info("✅ Lyrics found on LrcLib (plain text fallback)")
-                return lrclib_plain
-        
-        logger.warning(f"❌ No lyrics found for: {artist_name} - {track_name}")
+        tasks.append(asyncio.create_task(
+            self._fetch_from_musixmatch(track_name, artist_name)
+        ))
+
+        # Plain-text preference mirrors the old fallback order
+        plain_rank = {'Genius': 0, 'Musixmatch': 1, 'LrcLib': 2}
+
+        best = None
+        definitive_miss = False
+        try:
+            for future in asyncio.as_completed(tasks):
+                result = await future
+                if result is _MISS:
+                    # Provider looked and found nothing — that miss is
+                    # worth remembering, unlike an error or timeout
+                    definitive_miss = True
+                    continue
+                if not result:
+                    continue
+
+                # Synced lyrics (or any hit when synced isn't preferred)
+                # win immediately — cancel the slower providers
+                if result['synced'] or not prefer_synced:
+                    best = result
+                    break
+
+                # Plain text: keep the best-ranked hit while waiting for
+                # a synced result from the remaining providers
+                if best is None or plain_rank[result['source']] < plain_rank[best['source']]:
+                    best = result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        # Only cache a negative when a provider definitively had no
+        # lyrics — if every attempt errored/timed out, a transient
+        # outage would otherwise masquerade as a 24h cached miss
+        if best or definitive_miss:
+            self._cache_put(cache_key, best)
+
+        if best:
+            logger.info("✅ Lyrics found on %s (synced: %s)", best['source'], best['synced'])
+            return best
+
+        logger.warning("❌ No lyrics found for: %s - %s", artist_name, track_name)
         return None
-    
+
+    async def fetch_many(
+        self,
+        tracks: List[Tuple],
+        concurrency: int = 16
+    ) -> List[Optional[Dict]]:
+        """
+        Fetch LrcLib lyrics for a batch of tracks concurrently.
+
+        Designed for library-wide enrichment, where per-track serial
+        lookups dominate wall time. All requests share the keep-alive
+        session; a semaphore bounds in-flight requests.
+
+        Args:
+            tracks: List of (track_name, artist_name) tuples, optionally
+                    extended with album_name and duration_seconds
+            concurrency: Maximum number of in-flight LrcLib requests
+
+        Returns:
+            List of lyrics dicts (or None per miss), in input order
+        """
+        sem = asyncio.Semaphore(concurrency)
+
+        async def fetch_one(track_info: Tuple) -> Optional[Dict]:
+            track, artist = track_info[0], track_info[1]
+            album = track_info[2] if len(track_info) > 2 else None
+            duration = track_info[3] if len(track_info) > 3 else None
+            async with sem:
+                result = await self._fetch_from_lrclib(
+                    track, artist, album, duration, accept_plain=True
+                )
+                return None if result is _MISS else result
+
+        return await asyncio.gather(*(fetch_one(t) for t in tracks))
+
+    async def _get_with_retry(self, url: str, *, retries: int = 2, **kwargs):
+        """
+        GET with bounded retries and jittered exponential backoff.
+
+        Retries connection errors, per-attempt timeouts and 5xx
+        responses; anything else (200, 404, ...) is returned to the
+        caller as-is. The 5s per-attempt timeout keeps two retries
+        within the old single-shot 10s budget.
+        """
+        await self._ensure_session()
+
+        for attempt in range(retries + 1):
+            try:
+                response = await self.session.get(
+                    url,
+                    timeout=aiohttp.ClientTimeout(total=5),
+                    **kwargs
+                )
+                if response.status < 500 or attempt == retries:
+                    return response
+                response.release()
+                logger.debug("Retrying %s after HTTP %s", url, response.status)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == retries:
+                    raise
+                logger.debug("Retrying %s after connection error", url)
+
+            await asyncio.sleep(0.5 * (2 ** attempt) + random.random() * 0.2)
+
     async def _fetch_from_lrclib(
         self, 
         track: str, 
@@ -141,9 +361,9 @@ class LyricsFetcher:
             
             url = f"{self.LRCLIB_API}/get"
             
-            async with self.session.get(url, params=params, timeout=10) as response:
+            async with await self._get_with_retry(url, params=params) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = orjson.loads(await response.read())
                     
                     # Prefer synced lyrics
                     if data.get('syncedLyrics'):
@@ -160,15 +380,18 @@ class LyricsFetcher:
                             'synced': False,
                             'source': 'LrcLib'
                         }
+                    # Definitive answer, just no usable lyrics in it
+                    return _MISS
                 elif response.status == 404:
-                    logger.debug(f"LrcLib: No lyrics found for {artist} - {track}")
+                    logger.debug("LrcLib: No lyrics found for %s - %s", artist, track)
+                    return _MISS
                 else:
-                    logger.warning(f"LrcLib API error: {response.status}")
+                    logger.warning("LrcLib API error: %s", response.status)
         
         except asyncio.TimeoutError:
             logger.warning("LrcLib request timed out")
         except Exception as e:
-            logger.error(f"LrcLib error: {e}")
+            logger.error("LrcLib error: %s", e)
         
         return None
     
@@ -180,55 +403,51 @@ class LyricsFetcher:
         """
         if not self.genius_token:
             return None
-        
+
         try:
             # Step 1: Search for track
             search_url = f"{self.GENIUS_API}/search"
             headers = {'Authorization': f'Bearer {self.genius_token}'}
             params = {'q': f"{track} {artist}"}
             
-            async with self.session.get(
-                search_url, 
-                headers=headers, 
-                params=params,
-                timeout=10
+            async with await self._get_with_retry(
+                search_url,
+                headers=headers,
+                params=params
             ) as response:
                 if response.status != 200:
-                    logger.warning(f"Genius search failed: {response.status}")
+                    logger.warning("Genius search failed: %s", response.status)
                     return None
                 
-                data = await response.json()
+                data = orjson.loads(await response.read())
                 hits = data.get('response', {}).get('hits', [])
                 
                 if not hits:
-                    logger.debug(f"Genius: No results for {artist} - {track}")
-                    return None
+                    logger.debug("Genius: No results for %s - %s", artist, track)
+                    return _MISS
                 
                 # Get first result's URL
                 song_url = hits[0]['result']['url']
             
             # Step 2: Scrape lyrics from song page
-            async with self.session.get(song_url, timeout=10) as response:
+            async with await self._get_with_retry(song_url) as response:
                 if response.status != 200:
                     return None
                 
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
+                # Hand raw bytes to Lexbor — it sniffs the charset
+                # itself, skipping a full decode/str copy of the page
+                html = await response.read()
+                tree = LexborHTMLParser(html)
+
                 # Find lyrics container (Genius uses multiple div classes)
-                lyrics_divs = soup.find_all('div', attrs={'data-lyrics-container': 'true'})
-                
+                lyrics_divs = tree.css('div[data-lyrics-container="true"]')
+
                 if not lyrics_divs:
                     logger.warning("Genius: Could not find lyrics on page")
                     return None
-                
+
                 # Extract text from all lyrics divs
-                lyrics_parts = []
-                for div in lyrics_divs:
-                    # Get text with line breaks preserved
-                    for br in div.find_all('br'):
-                        br.replace_with('\n')
-                    lyrics_parts.append(div.get_text())
+                lyrics_parts = [self._lyrics_text(div) for div in lyrics_divs]
                 
                 lyrics = '\n'.join(lyrics_parts).strip()
                 
@@ -242,10 +461,26 @@ class LyricsFetcher:
         except asyncio.TimeoutError:
             logger.warning("Genius request timed out")
         except Exception as e:
-            logger.error(f"Genius error: {e}")
+            logger.error("Genius error: %s", e)
         
         return None
     
+    @staticmethod
+    def _lyrics_text(div) -> str:
+        """
+        Extract text from a lyrics container, turning <br> into newlines.
+
+        Walks the subtree once instead of mutating every <br> node and
+        re-traversing for text.
+        """
+        parts = []
+        for node in div.traverse(include_text=True):
+            if node.tag == 'br':
+                parts.append('\n')
+            elif node.tag == '-text':
+                parts.append(node.text_content)
+        return ''.join(parts)
+
     async def _fetch_from_musixmatch(self, track: str, artist: str) -> Optional[Dict]:
         """
         Fetch from Musixmatch (web scraping - last resort).
@@ -257,42 +492,46 @@ class LyricsFetcher:
             search_query = f"{artist} {track}"
             search_url = f"{self.MUSIXMATCH_SEARCH}/{quote(search_query)}"
             
-            async with self.session.get(search_url, timeout=10) as response:
+            async with await self._get_with_retry(search_url) as response:
                 if response.status != 200:
-                    logger.warning(f"Musixmatch search failed: {response.status}")
+                    logger.warning("Musixmatch search failed: %s", response.status)
                     return None
                 
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
+                # Hand raw bytes to Lexbor — it sniffs the charset
+                # itself, skipping a full decode/str copy of the page
+                html = await response.read()
+                tree = LexborHTMLParser(html)
+
                 # Find first track result
-                track_link = soup.find('a', class_=re.compile(r'track-card'))
-                if not track_link or not track_link.get('href'):
-                    logger.debug(f"Musixmatch: No results for {artist} - {track}")
-                    return None
-                
+                track_link = tree.css_first('a[class*="track-card"]')
+                if not track_link or not track_link.attributes.get('href'):
+                    logger.debug("Musixmatch: No results for %s - %s", artist, track)
+                    return _MISS
+
                 # Get lyrics page URL
-                lyrics_url = f"https://www.musixmatch.com{track_link['href']}"
+                lyrics_url = f"https://www.musixmatch.com{track_link.attributes['href']}"
             
             # Fetch lyrics page
-            async with self.session.get(lyrics_url, timeout=10) as response:
+            async with await self._get_with_retry(lyrics_url) as response:
                 if response.status != 200:
                     return None
                 
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
+                # Hand raw bytes to Lexbor — it sniffs the charset
+                # itself, skipping a full decode/str copy of the page
+                html = await response.read()
+                tree = LexborHTMLParser(html)
+
                 # Find lyrics spans
-                lyrics_spans = soup.find_all('span', class_=re.compile(r'lyrics__content__\w+'))
-                
+                lyrics_spans = tree.css('span[class*="lyrics__content__"]')
+
                 if not lyrics_spans:
                     logger.warning("Musixmatch: Could not find lyrics on page")
                     return None
-                
+
                 # Extract text
                 lyrics_parts = []
                 for span in lyrics_spans:
-                    text = span.get_text().strip()
+                    text = span.text().strip()
                     if text:
                         lyrics_parts.append(text)
                 
@@ -311,7 +550,7 @@ class LyricsFetcher:
         except asyncio.TimeoutError:
             logger.warning("Musixmatch request timed out")
         except Exception as e:
-            logger.error(f"Musixmatch error: {e}")
+            logger.error("Musixmatch error: %s", e)
         
         return None
 
@@ -325,13 +564,11 @@ def clean_lyrics(lyrics: str) -> str:
     - Normalize line breaks
     - Remove common artifacts
     """
-    # Remove \r characters
-    lyrics = lyrics.replace('\r', '')
-    
-    # Remove multiple consecutive blank lines
-    lyrics = re.sub(r'\n{3,}', '\n\n', lyrics)
-    
-    # Remove leading/trailing whitespace
-    lyrics = lyrics.strip()
-    
-    return lyrics
+    # Drop \r via a translate table (C loop, no regex)
+    lyrics = lyrics.translate(_CR_TABLE)
+
+    # Collapse runs of blank lines, skipping the regex when there are none
+    if '\n\n\n' in lyrics:
+        lyrics = _MULTI_NEWLINE_RE.sub('\n\n', lyrics)
+
+    return lyrics.strip()
@@ -4,11 +4,15 @@ Supports ID3 tags (MP3/M4A) with album art embedding.
 Last updated: 2025-11-06 18:20
 """
 
+import io
 import logging
 import os
 import requests
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional
+from PIL import Image
 from mutagen.mp4 import MP4, MP4Cover
 from mutagen.id3 import ID3, TIT2, TPE1, TALB, TPE2, TDRC, TRCK, TPOS, USLT, APIC, TSRC
 from mutagen.mp3 import MP3
@@ -32,8 +36,25 @@ class MetadataWriter:
     - Album art (embedded from URL)
     """
     
+    _JPEG_SIG = b'\xff\xd8\xff'
+    _PNG_SIG = b'\x89PNG\r\n\x1a\n'
+
+    # Covers larger than this are resized and recompressed before
+    # embedding — a 1500x1500 JPEG adds hundreds of KB per track
+    MAX_COVER_SIZE = 600
+    COVER_JPEG_QUALITY = 85
+
     def __init__(self):
         """Initialize metadata writer."""
+        # Pooled session: album-art downloads reuse keep-alive
+        # connections instead of a TCP+TLS handshake per track
+        self._http = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32
+        )
+        self._http.mount('https://', adapter)
+        self._http.mount('http://', adapter)
         logger.info("✅ Metadata writer initialized")
     
     def write_metadata(
@@ -61,11 +82,11 @@ class MetadataWriter:
             elif file_ext == '.mp3':
                 return self._write_mp3_metadata(audio_file, metadata, lyrics)
             else:
-                logger.error(f"❌ Unsupported format: {file_ext}")
+                logger.error("❌ Unsupported format: %s", file_ext)
                 return False
                 
         except Exception as e:
-            logger.error(f"❌ Failed to write metadata: {e}", exc_info=True)
+            logger.error("❌ Failed to write metadata: %s", e, exc_info=True)
             return False
     
     def _write_m4a_metadata(
@@ -85,7 +106,7 @@ class MetadataWriter:
         Returns:
             True if successful
         """
-        logger.info(f"📝 Writing M4A metadata: {audio_file.name}")
+        logger.info("📝 Writing M4A metadata: %s", audio_file.name)
         
         audio = MP4(audio_file)
         
@@ -140,7 +161,7 @@ class MetadataWriter:
         
         # Save
         audio.save()
-        logger.info(f"✅ M4A metadata written successfully")
+        logger.info("✅ M4A metadata written successfully")
         return True
     
     def _write_mp3_metadata(
@@ -160,7 +181,7 @@ class MetadataWriter:
         Returns:
             True if successful
         """
-        logger.info(f"📝 Writing MP3 metadata: {audio_file.name}")
+        logger.info("📝 Writing MP3 metadata: %s", audio_file.name)
         
         # Load or create ID3 tags
         try:
@@ -219,9 +240,102 @@ class MetadataWriter:
         
         # Save
         audio.save(audio_file)
-        logger.info(f"✅ MP3 metadata written successfully")
+        logger.info("✅ MP3 metadata written successfully")
         return True
     
+    def write_many(
+        self,
+        jobs: list,
+        workers: Optional[int] = None
+    ) -> list:
+        """
+        Write metadata for a batch of tracks across a process pool.
+
+        Mutagen parsing/saving is pure Python and GIL-bound, so
+        independent tracks scale with cores in separate processes.
+        Each worker process builds its own MetadataWriter (sessions and
+        caches don't pickle), and its cover cache still collapses
+        repeated album-art URLs within that worker.
+
+        Args:
+            jobs: List of (audio_file, metadata, lyrics) tuples
+            workers: Process count (defaults to os.cpu_count())
+
+        Returns:
+            List of per-job success booleans, in input order
+        """
+        if len(jobs) <= 1:
+            return [self.write_metadata(*job) for job in jobs]
+
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            return list(pool.map(_write_metadata_job, jobs))
+
+    @lru_cache(maxsize=128)
+    def _download_cover(self, url: str) -> tuple:
+        """
+        Download album art and detect its format, cached by URL.
+
+        All tracks of an album share one album_art_url, so without the
+        cache a 12-track album downloads the same cover 12 times.
+
+        Returns:
+            (image_data, format_tag) where format_tag is 'jpeg' or 'png'
+        """
+        response = self._http.get(url, timeout=10)
+        response.raise_for_status()
+
+        image_data = self._shrink_cover(response.content)
+        return image_data, self._detect_image_format(image_data)
+
+    @staticmethod
+    def _shrink_cover(data: bytes) -> bytes:
+        """
+        Resize and recompress oversized album art.
+
+        Anything within MAX_COVER_SIZE is returned untouched to
+        preserve the original encoding; larger images are thumbnailed
+        and re-encoded as JPEG. Undecodable data is embedded as-is.
+        """
+        try:
+            img = Image.open(io.BytesIO(data))
+            if max(img.size) <= MetadataWriter.MAX_COVER_SIZE:
+                return data
+
+            img.thumbnail(
+                (MetadataWriter.MAX_COVER_SIZE, MetadataWriter.MAX_COVER_SIZE),
+                Image.LANCZOS
+            )
+            if img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+
+            buf = io.BytesIO()
+            img.save(
+                buf, 'JPEG',
+                quality=MetadataWriter.COVER_JPEG_QUALITY,
+                optimize=True
+            )
+            return buf.getvalue()
+
+        except Exception as e:
+            logger.warning("⚠️ Could not resize cover, embedding original: %s", e)
+            return data
+
+    @staticmethod
+    def _detect_image_format(data: bytes) -> str:
+        """
+        Detect image format from magic bytes.
+
+        Returns:
+            'jpeg' or 'png' ('jpeg' assumed for anything unrecognized)
+        """
+        if data.startswith(MetadataWriter._JPEG_SIG):
+            return 'jpeg'
+        if data.startswith(MetadataWriter._PNG_SIG):
+            return 'png'
+        logger.warning("⚠️ Unknown image format, assuming JPEG")
+        return 'jpeg'
+
     def _embed_m4a_album_art(self, audio: MP4, album_art_url: str) -> bool:
         """
         Download and embed album art in M4A file.
@@ -234,27 +348,18 @@ class MetadataWriter:
             True if successful
         """
         try:
-            # Download album art
-            response = requests.get(album_art_url, timeout=10)
-            response.raise_for_status()
-            
-            image_data = response.content
-            
-            # Determine format
-            if image_data[:4] == b'\xff\xd8\xff\xe0' or image_data[:3] == b'\xff\xd8\xff':
-                image_format = MP4Cover.FORMAT_JPEG
-            elif image_data[:8] == b'\x89PNG\r\n\x1a\n':
-                image_format = MP4Cover.FORMAT_PNG
-            else:
-                logger.warning("⚠️ Unknown image format, assuming JPEG")
-                image_format = MP4Cover.FORMAT_JPEG
-            
+            image_data, image_format = self._download_cover(album_art_url)
+            mp4_format = (
+                MP4Cover.FORMAT_PNG if image_format == 'png'
+                else MP4Cover.FORMAT_JPEG
+            )
+
             # Embed
-            audio['covr'] = [MP4Cover(image_data, imageformat=image_format)]
+            audio['covr'] = [MP4Cover(image_data, imageformat=mp4_format)]
             return True
             
         except Exception as e:
-            logger.error(f"❌ Failed to embed M4A album art: {e}")
+            logger.error("❌ Failed to embed M4A album art: %s", e)
             return False
     
     def _embed_mp3_album_art(self, audio: ID3, album_art_url: str) -> bool:
@@ -269,21 +374,9 @@ class MetadataWriter:
             True if successful
         """
         try:
-            # Download album art
-            response = requests.get(album_art_url, timeout=10)
-            response.raise_for_status()
-            
-            image_data = response.content
-            
-            # Determine MIME type
-            if image_data[:4] == b'\xff\xd8\xff\xe0' or image_data[:3] == b'\xff\xd8\xff':
-                mime_type = 'image/jpeg'
-            elif image_data[:8] == b'\x89PNG\r\n\x1a\n':
-                mime_type = 'image/png'
-            else:
-                logger.warning("⚠️ Unknown image format, assuming JPEG")
-                mime_type = 'image/jpeg'
-            
+            image_data, image_format = self._download_cover(album_art_url)
+            mime_type = f'image/{image_format}'
+
             # Embed (type 3 = front cover)
             audio['APIC'] = APIC(
                 encoding=3,
@@ -295,5 +388,18 @@ class MetadataWriter:
             return True
             
         except Exception as e:
-            logger.error(f"❌ Failed to embed MP3 album art: {e}")
+            logger.error("❌ Failed to embed MP3 album art: %s", e)
             return False
+
+# Per-process writer for write_many — module-level so jobs pickle
+# cheaply and each worker reuses one HTTP session and cover cache
+_worker_writer: Optional[MetadataWriter] = None
+
+
+def _write_metadata_job(job: tuple) -> bool:
+    """Run one (audio_file, metadata, lyrics) job in a worker process."""
+    global _worker_writer
+    if _worker_writer is None:
+        _worker_writer = MetadataWriter()
+    audio_file, metadata, lyrics = job
+    return _worker_writer.write_metadata(audio_file, metadata, lyrics)
@@ -15,13 +15,36 @@ API: https://musicbrainz.org/doc/MusicBrainz_API
 
 import aiohttp
 import asyncio
+import diskcache
+import orjson
+import re
 import time
+from cachetools import TTLCache
+from functools import lru_cache
 from typing import List, Optional, Dict, Tuple
 import logging
 import urllib.parse
 
+from config import CACHE_DIR
+
 logger = logging.getLogger(__name__)
 
+# Lucene reserved characters — unescaped, a title like 'What "Is" Love?'
+# yields HTTP 400 from the search endpoint and burns a rate-limit slot
+_LUCENE_RE = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+
+
+def _lucene_escape(text: str) -> str:
+    """Escape Lucene query syntax so titles with punctuation still match."""
+    return _LUCENE_RE.sub(r'\\\1', text)
+
+
+@lru_cache(maxsize=8192)
+def _mb_key(kind: str, artist: str, track: str = "") -> tuple:
+    """Build a normalized cache key, memoized so repeat lookups skip
+    the strip/casefold work entirely."""
+    return (kind, artist.strip().casefold(), track.strip().casefold())
+
 
 class MusicBrainzEnrichment:
     """
@@ -33,37 +56,99 @@ class MusicBrainzEnrichment:
     API_BASE = "https://musicbrainz.org/ws/2"
     USER_AGENT = "RetroMusic-Server/1.0 ( https://github.com/retromusic )"
     MIN_REQUEST_INTERVAL = 1.1  # 1.1 seconds to be safe (MusicBrainz requires 1s minimum)
+
+    # Disk TTLs: aliases can change, ISRCs are effectively immutable
+    ALIAS_DISK_TTL = 30 * 86400
+    ISRC_DISK_TTL = 365 * 86400
     
     def __init__(self):
-        self.session = aiohttp.ClientSession(headers={
-            'User-Agent': self.USER_AGENT,
-            'Accept': 'application/json'
-        })
-        self.last_request_time = 0.0
-        self._lock = asyncio.Lock()  # Ensure serial requests
-        self._cache: Dict[str, any] = {}  # Cache to reduce API calls
+        # Small bounded pool: we talk to one host at 1 req/s, so a
+        # couple of warm keep-alive connections suffice and also act
+        # as a backstop if the rate limiter were ever misconfigured
+        connector = aiohttp.TCPConnector(
+            limit=4,
+            limit_per_host=2,
+            keepalive_timeout=75,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=15, connect=5),
+            headers={
+                'User-Agent': self.USER_AGENT,
+                'Accept': 'application/json'
+            }
+        )
+        self._next_allowed = 0.0  # Monotonic timestamp of the next free slot
+        self._lock = asyncio.Lock()  # Guards slot assignment only
+        # Bounded LRU with daily expiry — every hit skips a ~1.1s
+        # rate-limited round trip, and the bound keeps a long-running
+        # server from leaking cache memory
+        self._cache = TTLCache(maxsize=4096, ttl=86400)
+        # In-flight lookups keyed like the cache — concurrent identical
+        # calls share one rate-limited request instead of queueing N
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        # Disk layer behind the memory LRU — every cold-start miss
+        # costs >=1.1s of rate-limit wait, so results survive restarts
+        self._disk = diskcache.Cache(
+            str(CACHE_DIR / 'musicbrainz'),
+            size_limit=512 * 1024 * 1024
+        )
     
     async def close(self):
-        """Close HTTP session"""
+        """Close HTTP session and the disk cache"""
         await self.session.close()
+        self._disk.close()
     
     async def _enforce_rate_limit(self):
         """
         Enforce MusicBrainz rate limit: 1 request per second.
-        
+
         This MUST be called before every API request!
+
+        Each caller claims the next free slot under the lock, then
+        sleeps *outside* it — waiting callers queue up fairly instead
+        of serializing on a lock held across the sleep. Uses
+        time.monotonic() so wall-clock jumps can't skew the schedule.
         """
         async with self._lock:
-            current_time = time.time()
-            time_since_last = current_time - self.last_request_time
-            
-            if time_since_last < self.MIN_REQUEST_INTERVAL:
-                sleep_time = self.MIN_REQUEST_INTERVAL - time_since_last
-                logger.debug(f"⏳ MusicBrainz rate limit: sleeping {sleep_time:.2f}s")
-                await asyncio.sleep(sleep_time)
-            
-            self.last_request_time = time.time()
-    
+            slot = max(time.monotonic(), self._next_allowed)
+            self._next_allowed = slot + self.MIN_REQUEST_INTERVAL
+
+        delay = slot - time.monotonic()
+        if delay > 0:
+            logger.debug("⏳ MusicBrainz rate limit: sleeping %.2fs", delay)
+            await asyncio.sleep(delay)
+
+    async def _single_flight(self, cache_key: tuple, fetch):
+        """
+        Run `fetch()` unless an identical lookup is already in flight,
+        in which case await its result instead.
+
+        Ten concurrent calls for the same artist would otherwise each
+        pay the 1.1s rate limiter for identical output.
+        """
+        existing = self._inflight.get(cache_key)
+        if existing is not None:
+            return await existing
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = fut
+        try:
+            result = await fetch()
+            fut.set_result(result)
+            return result
+        except Exception as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            # CancelledError bypasses the except clause above — cancel a
+            # still-pending future so waiters don't hang forever
+            if not fut.done():
+                fut.cancel()
+            del self._inflight[cache_key]
+
     async def find_artist_aliases(self, artist_name: str) -> List[str]:
         """
         Find artist aliases and name variations.
@@ -74,80 +159,95 @@ class MusicBrainzEnrichment:
         Returns:
             List of alias names (including original)
         """
-        cache_key = f"aliases_{artist_name}"
+        cache_key = _mb_key('aliases', artist_name)
         if cache_key in self._cache:
-            logger.debug(f"MusicBrainz cache hit for artist aliases: {artist_name}")
+            logger.debug("MusicBrainz cache hit for artist aliases: %s", artist_name)
             return self._cache[cache_key]
-        
+
+        cached = self._disk.get(cache_key)
+        if cached is not None:
+            self._cache[cache_key] = cached  # Promote to memory
+            return cached
+
+        return await self._single_flight(
+            cache_key,
+            lambda: self._fetch_aliases(artist_name, cache_key)
+        )
+
+    async def _fetch_aliases(self, artist_name: str, cache_key: tuple) -> List[str]:
+        """Network path for find_artist_aliases (usually one API call)."""
         try:
             await self._enforce_rate_limit()
-            
-            # Search for artist
+
+            # Search for artist — matching on alias: too means the search
+            # hit itself usually carries the aliases array, so the common
+            # case resolves in one rate-limited request instead of two
             search_url = f"{self.API_BASE}/artist"
             params = {
-                'query': f'artist:"{artist_name}"',
+                'query': f'artist:"{_lucene_escape(artist_name)}" OR alias:"{_lucene_escape(artist_name)}"',
                 'limit': 1,
                 'fmt': 'json'
             }
-            
-            async with self.session.get(search_url, params=params, timeout=15) as response:
+
+            async with self.session.get(search_url, params=params) as response:
                 if response.status != 200:
-                    logger.warning(f"MusicBrainz artist search failed: {response.status}")
+                    logger.warning("MusicBrainz artist search failed: %s", response.status)
                     return [artist_name]
-                
-                data = await response.json()
+
+                data = orjson.loads(await response.read())
                 artists = data.get('artists', [])
-                
+
                 if not artists:
-                    logger.debug(f"MusicBrainz: No artist found for {artist_name}")
+                    logger.debug("MusicBrainz: No artist found for %s", artist_name)
                     return [artist_name]
-                
+
                 artist = artists[0]
-                artist_id = artist['id']
-            
-            # Fetch artist with aliases (requires separate request with 'inc' parameter)
-            await self._enforce_rate_limit()
-            
-            artist_url = f"{self.API_BASE}/artist/{artist_id}"
-            params = {'inc': 'aliases', 'fmt': 'json'}
-            
-            async with self.session.get(artist_url, params=params, timeout=15) as response:
-                if response.status != 200:
-                    return [artist_name]
-                
-                data = await response.json()
-                
-                # Collect aliases
-                aliases = {artist_name}  # Include original name
-                
-                # Add primary name
-                if 'name' in data:
-                    aliases.add(data['name'])
-                
-                # Add sort name
-                if 'sort-name' in data:
-                    aliases.add(data['sort-name'])
-                
-                # Add all aliases
-                for alias in data.get('aliases', []):
-                    if 'name' in alias:
-                        aliases.add(alias['name'])
-                
-                alias_list = list(aliases)
-                
-                # Cache result
-                self._cache[cache_key] = alias_list
-                
-                logger.info(f"🎭 MusicBrainz aliases for {artist_name}: {len(alias_list)} found")
-                logger.debug(f"   Aliases: {', '.join(alias_list[:5])}")
-                
-                return alias_list
-        
+
+            if 'aliases' not in artist:
+                # Rare: hit lacks the aliases array — fall back to a
+                # direct lookup with inc=aliases (second request)
+                await self._enforce_rate_limit()
+
+                artist_url = f"{self.API_BASE}/artist/{artist['id']}"
+                params = {'inc': 'aliases', 'fmt': 'json'}
+
+                async with self.session.get(artist_url, params=params) as response:
+                    if response.status != 200:
+                        return [artist_name]
+                    artist = orjson.loads(await response.read())
+
+            # Collect aliases
+            aliases = {artist_name}  # Include original name
+
+            # Add primary name
+            if 'name' in artist:
+                aliases.add(artist['name'])
+
+            # Add sort name
+            if 'sort-name' in artist:
+                aliases.add(artist['sort-name'])
+
+            # Add all aliases
+            for alias in artist.get('aliases', []):
+                if 'name' in alias:
+                    aliases.add(alias['name'])
+
+            alias_list = list(aliases)
+
+            # Cache result
+            self._cache[cache_key] = alias_list
+            self._disk.set(cache_key, alias_list, expire=self.ALIAS_DISK_TTL)
+
+            logger.info("🎭 MusicBrainz aliases for %s: %s found", artist_name, len(alias_list))
+            logger.debug("   Aliases: %s", ', '.join(alias_list[:5]))
+
+            return alias_list
+
         except asyncio.TimeoutError:
-            logger.warning(f"MusicBrainz request timed out for {artist_name}")
+            logger.warning("MusicBrainz request timed out for %s", artist_name)
         except Exception as e:
-            logger.error(f"MusicBrainz aliases error: {e}")
-        
+            logger.error("MusicBrainz aliases error: %s", e)
+
         return [artist_name]
     
     async def verify_track_isrc(
@@ -169,73 +269,192 @@ class MusicBrainzEnrichment:
         Returns:
             ISRC code or None if not found
         """
-        cache_key = f"isrc_{artist_name}_{track_name}"
+        cache_key = _mb_key('isrc', artist_name, track_name)
         if cache_key in self._cache:
-            logger.debug(f"MusicBrainz cache hit for ISRC: {track_name}")
+            logger.debug("MusicBrainz cache hit for ISRC: %s", track_name)
             return self._cache[cache_key]
-        
+
+        cached = self._disk.get(cache_key)
+        if cached is not None:
+            self._cache[cache_key] = cached  # Promote to memory
+            return cached
+
+        return await self._single_flight(
+            cache_key,
+            lambda: self._fetch_isrc(track_name, artist_name, expected_isrc, cache_key)
+        )
+
+    async def _fetch_isrc(
+        self,
+        track_name: str,
+        artist_name: str,
+        expected_isrc: Optional[str],
+        cache_key: tuple
+    ) -> Optional[str]:
+        """Network path for verify_track_isrc."""
         try:
-            await self._enforce_rate_limit()
-            
             # Search for recording by ISRC if provided
             if expected_isrc:
+                await self._enforce_rate_limit()
+
                 search_url = f"{self.API_BASE}/isrc/{expected_isrc}"
                 params = {'fmt': 'json'}
-                
-                async with self.session.get(search_url, params=params, timeout=15) as response:
+
+                async with self.session.get(search_url, params=params) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = orjson.loads(await response.read())
                         recordings = data.get('recordings', [])
-                        
+
                         if recordings:
                             # ISRC verified!
-                            logger.info(f"✅ MusicBrainz: ISRC {expected_isrc} verified")
+                            logger.info("✅ MusicBrainz: ISRC %s verified", expected_isrc)
                             self._cache[cache_key] = expected_isrc
+                            self._disk.set(cache_key, expected_isrc, expire=self.ISRC_DISK_TTL)
                             return expected_isrc
-            
-            # Search by track and artist
-            await self._enforce_rate_limit()
-            
-            search_url = f"{self.API_BASE}/recording"
-            query = f'recording:"{track_name}" AND artist:"{artist_name}"'
+
+            # Search by track and artist — shared with get_recording_info,
+            # so a caller needing both pays for one request, not two
+            recording = await self._fetch_recording(track_name, artist_name)
+
+            if recording and recording.get('isrcs'):
+                isrc = recording['isrcs'][0]
+
+                # Cache and return
+                self._cache[cache_key] = isrc
+                self._disk.set(cache_key, isrc, expire=self.ISRC_DISK_TTL)
+
+                logger.info("🔍 MusicBrainz: ISRC found for %s: %s", track_name, isrc)
+                return isrc
+
+            logger.debug("MusicBrainz: No ISRC found in recordings for %s", track_name)
+
+        except asyncio.TimeoutError:
+            logger.warning("MusicBrainz request timed out for %s", track_name)
+        except Exception as e:
+            logger.error("MusicBrainz ISRC error: %s", e)
+
+        return None
+
+    # Keep compound queries under MusicBrainz's ~1024-char Lucene limit
+    MAX_BATCH_QUERY_CHARS = 900
+
+    async def verify_track_isrc_batch(
+        self,
+        tracks: List[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], Optional[str]]:
+        """
+        Find ISRCs for many tracks with as few requests as possible.
+
+        The search endpoint accepts compound Lucene queries, so pending
+        (track, artist) pairs are OR-ed into one request per batch
+        instead of paying the 1.1s rate limit per track — a 20-track
+        playlist resolves in one or two requests rather than twenty.
+
+        Args:
+            tracks: List of (track_name, artist_name) tuples
+
+        Returns:
+            Dict mapping each (track_name, artist_name) to its ISRC
+            (or None when no recording with an ISRC matched)
+        """
+        results: Dict[Tuple[str, str], Optional[str]] = {}
+
+        pending = []
+        for track_name, artist_name in tracks:
+            key = _mb_key('isrc', artist_name, track_name)
+            if key in self._cache:
+                results[(track_name, artist_name)] = self._cache[key]
+                continue
+            cached = self._disk.get(key)
+            if cached is not None:
+                self._cache[key] = cached
+                results[(track_name, artist_name)] = cached
+            else:
+                pending.append((track_name, artist_name))
+
+        # Split pending pairs into query-length-bounded batches
+        batches = []
+        batch, batch_len = [], 0
+        for pair in pending:
+            clause_len = len(pair[0]) + len(pair[1]) + 32
+            if batch and batch_len + clause_len > self.MAX_BATCH_QUERY_CHARS:
+                batches.append(batch)
+                batch, batch_len = [], 0
+            batch.append(pair)
+            batch_len += clause_len
+        if batch:
+            batches.append(batch)
+
+        for batch in batches:
+            query = ' OR '.join(
+                f'(recording:"{_lucene_escape(t)}" AND artist:"{_lucene_escape(a)}")'
+                for t, a in batch
+            )
             params = {
                 'query': query,
-                'limit': 5,
+                'limit': len(batch) * 3,
                 'fmt': 'json'
             }
-            
-            async with self.session.get(search_url, params=params, timeout=15) as response:
-                if response.status != 200:
-                    logger.warning(f"MusicBrainz recording search failed: {response.status}")
-                    return None
-                
-                data = await response.json()
-                recordings = data.get('recordings', [])
-                
-                if not recordings:
-                    logger.debug(f"MusicBrainz: No recording found for {artist_name} - {track_name}")
-                    return None
-                
-                # Try to find a recording with ISRC
-                for recording in recordings:
-                    if 'isrcs' in recording and recording['isrcs']:
-                        isrc = recording['isrcs'][0]
-                        
-                        # Cache and return
-                        self._cache[cache_key] = isrc
-                        
-                        logger.info(f"🔍 MusicBrainz: ISRC found for {track_name}: {isrc}")
-                        return isrc
-                
-                logger.debug(f"MusicBrainz: No ISRC found in recordings for {track_name}")
-        
-        except asyncio.TimeoutError:
-            logger.warning(f"MusicBrainz request timed out for {track_name}")
-        except Exception as e:
-            logger.error(f"MusicBrainz ISRC error: {e}")
-        
-        return None
-    
+
+            recordings = []
+            try:
+                await self._enforce_rate_limit()
+                search_url = f"{self.API_BASE}/recording"
+                async with self.session.get(search_url, params=params) as response:
+                    if response.status == 200:
+                        data = orjson.loads(await response.read())
+                        recordings = data.get('recordings', [])
+                    else:
+                        logger.warning("MusicBrainz batch search failed: %s", response.status)
+            except asyncio.TimeoutError:
+                logger.warning("MusicBrainz batch request timed out")
+            except Exception as e:
+                logger.error("MusicBrainz batch ISRC error: %s", e)
+
+            self._match_batch_recordings(batch, recordings, results)
+
+        return results
+
+    def _match_batch_recordings(
+        self,
+        batch: List[Tuple[str, str]],
+        recordings: List[Dict],
+        results: Dict[Tuple[str, str], Optional[str]]
+    ):
+        """Map batched search results back to their (track, artist) pairs."""
+        wanted = {
+            (pair[0].strip().casefold(), pair[1].strip().casefold()): pair
+            for pair in batch
+        }
+
+        for recording in recordings:
+            isrcs = recording.get('isrcs')
+            if not isrcs:
+                continue
+
+            title = recording.get('title', '').strip().casefold()
+            credits = [
+                ac['name'].strip().casefold()
+                for ac in recording.get('artist-credit', [])
+                if isinstance(ac, dict) and 'name' in ac
+            ]
+
+            for (norm_track, norm_artist), pair in wanted.items():
+                if results.get(pair):
+                    continue
+                if title == norm_track and any(
+                    norm_artist == credit or norm_artist in credit
+                    for credit in credits
+                ):
+                    results[pair] = isrcs[0]
+                    key = _mb_key('isrc', pair[1], pair[0])
+                    self._cache[key] = isrcs[0]
+                    self._disk.set(key, isrcs[0], expire=self.ISRC_DISK_TTL)
+                    logger.info("🔍 MusicBrainz: ISRC found for %s: %s", pair[0], isrcs[0])
+
+        for pair in batch:
+            results.setdefault(pair, None)
+
     async def get_recording_info(
         self, 
         track_name: str,
@@ -251,56 +470,98 @@ class MusicBrainzEnrichment:
         Returns:
             Dict with: title, artist, isrc, length, country, date
         """
+        recording = await self._fetch_recording(track_name, artist_name)
+        if not recording:
+            return None
+
+        info = {
+            'title': recording.get('title'),
+            'length_ms': recording.get('length'),  # Duration in milliseconds
+            'isrc': recording.get('isrcs', [None])[0],
+            'source': 'MusicBrainz'
+        }
+
+        # Extract artist name
+        if 'artist-credit' in recording:
+            artists = [ac['name'] for ac in recording['artist-credit'] if 'name' in ac]
+            info['artists'] = artists
+
+        # Extract release info (country, date)
+        if 'releases' in recording and recording['releases']:
+            release = recording['releases'][0]
+            info['country'] = release.get('country')
+            info['date'] = release.get('date')
+
+        logger.info("✅ MusicBrainz recording info: %s (ISRC: %s)", info.get('title'), info.get('isrc'))
+        return info
+
+    async def _fetch_recording(
+        self,
+        track_name: str,
+        artist_name: str
+    ) -> Optional[Dict]:
+        """
+        Fetch the best recording match for (track, artist), cached.
+
+        Both verify_track_isrc and get_recording_info need the same
+        search — one cached result serves both instead of each paying
+        its own 1.1s rate-limited request.
+        """
+        cache_key = _mb_key('recording', artist_name, track_name)
+        if cache_key in self._cache:
+            return self._cache[cache_key]
+
+        return await self._single_flight(
+            cache_key,
+            lambda: self._fetch_recording_network(track_name, artist_name, cache_key)
+        )
+
+    async def _fetch_recording_network(
+        self,
+        track_name: str,
+        artist_name: str,
+        cache_key: tuple
+    ) -> Optional[Dict]:
+        """Network path for _fetch_recording."""
         try:
             await self._enforce_rate_limit()
-            
+
             search_url = f"{self.API_BASE}/recording"
-            query = f'recording:"{track_name}" AND artist:"{artist_name}"'
+            query = f'recording:"{_lucene_escape(track_name)}" AND artist:"{_lucene_escape(artist_name)}"'
             params = {
                 'query': query,
-                'limit': 1,
+                'limit': 5,
                 'fmt': 'json',
                 'inc': 'artists+isrcs+releases'
             }
-            
-            async with self.session.get(search_url, params=params, timeout=15) as response:
+
+            async with self.session.get(search_url, params=params) as response:
                 if response.status != 200:
+                    logger.warning("MusicBrainz recording search failed: %s", response.status)
                     return None
-                
-                data = await response.json()
+
+                data = orjson.loads(await response.read())
                 recordings = data.get('recordings', [])
-                
+
                 if not recordings:
+                    logger.debug("MusicBrainz: No recording found for %s - %s", artist_name, track_name)
                     return None
-                
-                recording = recordings[0]
-                
-                info = {
-                    'title': recording.get('title'),
-                    'length_ms': recording.get('length'),  # Duration in milliseconds
-                    'isrc': recording.get('isrcs', [None])[0],
-                    'source': 'MusicBrainz'
-                }
-                
-                # Extract artist name
-                if 'artist-credit' in recording:
-                    artists = [ac['name'] for ac in recording['artist-credit'] if 'name' in ac]
-                    info['artists'] = artists
-                
-                # Extract release info (country, date)
-                if 'releases' in recording and recording['releases']:
-                    release = recording['releases'][0]
-                    info['country'] = release.get('country')
-                    info['date'] = release.get('date')
-                
-                logger.info(f"✅ MusicBrainz recording info: {info.get('title')} (ISRC: {info.get('isrc')})")
-                return info
-        
+
+                # Prefer a hit carrying ISRCs so the one cached result
+                # also satisfies ISRC lookups
+                recording = next(
+                    (r for r in recordings if r.get('isrcs')),
+                    recordings[0]
+                )
+
+                self._cache[cache_key] = recording
+                return recording
+
         except asyncio.TimeoutError:
-            logger.warning(f"MusicBrainz request timed out for {track_name}")
+            logger.warning("MusicBrainz request timed out for %s", track_name)
         except Exception as e:
-            logger.error(f"MusicBrainz recording info error: {e}")
-        
+            logger.error("MusicBrainz recording info error: %s", e)
+
         return None
     
     def clear_cache(self):
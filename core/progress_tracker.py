@@ -6,231 +6,284 @@ Based on SERVER_MIGRATION_PLAN.md - Day 5
 """
 
 import asyncio
-from typing import Dict, List, Optional
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
 import logging
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Per-second memo for payload timestamps: a busy download fans out many
+# updates per second, and SSE doesn't need sub-second precision
+_ts_cache: list = [0, ""]
+
+
+def _now_iso() -> str:
+    """ISO wall-clock timestamp, formatted at most once per second."""
+    s = int(time.time())
+    if s != _ts_cache[0]:
+        _ts_cache[0] = s
+        _ts_cache[1] = datetime.fromtimestamp(s).isoformat()
+    return _ts_cache[1]
+
+
+@dataclass(slots=True)
+class DownloadState:
+    """All tracking state for one download, bundled in a single record."""
+    progress: int = 0
+    status: str = "Starting download..."
+    completed: bool = False
+    error: Optional[str] = None
+    # Monotonic float: age math is plain subtraction and immune to
+    # wall-clock jumps (DST/NTP). Wall-clock only appears in payloads.
+    start_time: float = field(default_factory=time.monotonic)
+    subscribers: Set[asyncio.Queue] = field(default_factory=set)
+    # Per-download lock: updates for one download never block another
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
 
 class ProgressTracker:
     """
     Tracks download progress for real-time updates via Server-Sent Events (SSE).
-    
+
     Features:
     - Multiple subscribers per download_id
     - Automatic cleanup of completed downloads
     - Thread-safe progress updates
     """
-    
+
     def __init__(self):
-        self._progress: Dict[str, int] = {}  # download_id -> progress (0-100)
-        self._status: Dict[str, str] = {}  # download_id -> status message
-        self._subscribers: Dict[str, List[asyncio.Queue]] = {}  # download_id -> list of queues
-        self._completed: Dict[str, bool] = {}  # download_id -> completion flag
-        self._errors: Dict[str, str] = {}  # download_id -> error message
-        self._start_times: Dict[str, datetime] = {}  # download_id -> start timestamp
+        # One record per download instead of six parallel dicts — each
+        # update touches a single hash slot, and slots keep the
+        # per-download footprint small
+        self._downloads: Dict[str, DownloadState] = {}
+        # Global lock only guards structural changes to _downloads;
+        # per-download updates go through each DownloadState's own lock
         self._lock = asyncio.Lock()
-    
+
     async def start_download(self, download_id: str) -> None:
         """Initialize progress tracking for a new download"""
         async with self._lock:
-            self._progress[download_id] = 0
-            self._status[download_id] = "Starting download..."
-            self._completed[download_id] = False
-            self._start_times[download_id] = datetime.now()
-            self._subscribers[download_id] = []
-            logger.info(f"📊 Progress tracker initialized for {download_id}")
-    
+            self._downloads[download_id] = DownloadState()
+            logger.info("📊 Progress tracker initialized for %s", download_id)
+
+    async def _get_or_create(self, download_id: str) -> DownloadState:
+        """Look up a download's state, registering it if unknown."""
+        state = self._downloads.get(download_id)
+        if state is None:
+            async with self._lock:
+                state = self._downloads.setdefault(download_id, DownloadState())
+        return state
+
     async def set_progress(
-        self, 
-        download_id: str, 
-        progress: int, 
+        self,
+        download_id: str,
+        progress: int,
         status: Optional[str] = None
     ) -> None:
         """
         Update progress and notify all subscribers.
-        
+
         Args:
             download_id: Unique download identifier
             progress: Progress percentage (0-100)
             status: Optional status message
         """
-        async with self._lock:
-            self._progress[download_id] = min(100, max(0, progress))
+        state = await self._get_or_create(download_id)
+        async with state.lock:
+            state.progress = min(100, max(0, progress))
             if status:
-                self._status[download_id] = status
-            
-            # Notify all subscribers
-            if download_id in self._subscribers:
-                for queue in self._subscribers[download_id]:
-                    try:
-                        await queue.put({
-                            'progress': self._progress[download_id],
-                            'status': self._status[download_id],
-                            'timestamp': datetime.now().isoformat()
-                        })
-                    except Exception as e:
-                        logger.error(f"❌ Failed to notify subscriber: {e}")
-            
+                state.status = status
+
+            # Build the payload once and share it across subscribers —
+            # it is never mutated, so one dict (and one timestamp) per
+            # update instead of one per subscriber
+            if state.subscribers:
+                payload = {
+                    'progress': state.progress,
+                    'status': state.status,
+                    'timestamp': _now_iso()
+                }
+                self._notify(download_id, state, payload)
+
             logger.debug(
-                f"📈 Progress update: {download_id} -> {progress}% "
-                f"({status or 'no status'})"
+                "📈 Progress update: %s -> %d%% (%s)",
+                download_id, progress, status or 'no status'
             )
-    
+
     async def complete_download(
-        self, 
-        download_id: str, 
+        self,
+        download_id: str,
         success: bool = True,
         error: Optional[str] = None
     ) -> None:
         """
         Mark download as complete and notify subscribers.
-        
+
         Args:
             download_id: Unique download identifier
             success: Whether download succeeded
             error: Error message if failed
         """
-        async with self._lock:
-            self._completed[download_id] = True
-            
+        state = await self._get_or_create(download_id)
+        async with state.lock:
+            state.completed = True
+
             if success:
-                self._progress[download_id] = 100
-                self._status[download_id] = "Download complete!"
-                elapsed = (datetime.now() - self._start_times.get(download_id, datetime.now())).total_seconds()
-                logger.info(f"✅ Download {download_id} completed in {elapsed:.1f}s")
+                state.progress = 100
+                state.status = "Download complete!"
+                elapsed = time.monotonic() - state.start_time
+                logger.info("✅ Download %s completed in %.1fs", download_id, elapsed)
             else:
-                self._errors[download_id] = error or "Unknown error"
-                self._status[download_id] = f"Failed: {error}"
-                logger.error(f"❌ Download {download_id} failed: {error}")
-            
+                state.error = error or "Unknown error"
+                state.status = f"Failed: {error}"
+                logger.error("❌ Download %s failed: %s", download_id, error)
+
             # Send final notification to all subscribers
-            if download_id in self._subscribers:
+            if state.subscribers:
                 final_message = {
-                    'progress': self._progress[download_id],
-                    'status': self._status[download_id],
+                    'progress': state.progress,
+                    'status': state.status,
                     'completed': True,
                     'success': success,
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp': _now_iso()
                 }
                 if error:
                     final_message['error'] = error
-                
-                for queue in self._subscribers[download_id]:
-                    try:
-                        await queue.put(final_message)
-                    except Exception as e:
-                        logger.error(f"❌ Failed to send completion notification: {e}")
-    
+
+                self._notify(download_id, state, final_message)
+
+    @staticmethod
+    def _notify(download_id: str, state: DownloadState, payload: Dict) -> None:
+        """Fan a shared payload out to every subscriber queue."""
+        # Copy: the set may change mid-iteration
+        for queue in list(state.subscribers):
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # Stuck/disconnected client: drop its oldest update so
+                # the queue stays bounded and ends on the newest state
+                try:
+                    queue.get_nowait()
+                    queue.put_nowait(payload)
+                except (asyncio.QueueEmpty, asyncio.QueueFull):
+                    pass
+                logger.warning("📡 Slow subscriber for %s, dropped oldest update", download_id)
+            except Exception as e:
+                logger.error("❌ Failed to notify subscriber: %s", e)
+
     def get_progress(self, download_id: str) -> int:
         """Get current progress for download_id (synchronous)"""
-        return self._progress.get(download_id, 0)
-    
+        state = self._downloads.get(download_id)
+        return state.progress if state else 0
+
     def get_status(self, download_id: str) -> str:
         """Get current status message for download_id"""
-        return self._status.get(download_id, "Unknown")
-    
+        state = self._downloads.get(download_id)
+        return state.status if state else "Unknown"
+
     def is_completed(self, download_id: str) -> bool:
         """Check if download is completed"""
-        return self._completed.get(download_id, False)
-    
+        state = self._downloads.get(download_id)
+        return state.completed if state else False
+
     def get_error(self, download_id: str) -> Optional[str]:
         """Get error message if download failed"""
-        return self._errors.get(download_id)
-    
+        state = self._downloads.get(download_id)
+        return state.error if state else None
+
     async def subscribe(self, download_id: str) -> asyncio.Queue:
         """
         Subscribe to progress updates for a download (for SSE).
-        
+
         Args:
             download_id: Unique download identifier
-            
+
         Returns:
             asyncio.Queue that will receive progress updates
         """
-        async with self._lock:
-            queue = asyncio.Queue()
-            
-            if download_id not in self._subscribers:
-                self._subscribers[download_id] = []
-            
-            self._subscribers[download_id].append(queue)
-            
-            # Send current state immediately
-            if download_id in self._progress:
+        state = self._downloads.get(download_id)
+        known = state is not None
+        if not known:
+            state = await self._get_or_create(download_id)
+
+        async with state.lock:
+            # Bounded: a client that stops draining holds at most 64
+            # updates instead of every update for the whole download
+            queue = asyncio.Queue(maxsize=64)
+
+            if known:
+                # Send current state immediately
                 await queue.put({
-                    'progress': self._progress[download_id],
-                    'status': self._status.get(download_id, "In progress..."),
-                    'timestamp': datetime.now().isoformat()
+                    'progress': state.progress,
+                    'status': state.status,
+                    'timestamp': _now_iso()
                 })
-            
-            logger.info(f"📡 New subscriber for {download_id} (total: {len(self._subscribers[download_id])})")
+
+            state.subscribers.add(queue)
+
+            logger.info("📡 New subscriber for %s (total: %s)", download_id, len(state.subscribers))
             return queue
-    
+
     async def unsubscribe(self, download_id: str, queue: asyncio.Queue) -> None:
         """
         Unsubscribe from progress updates.
-        
+
         Args:
             download_id: Unique download identifier
             queue: The queue to remove
         """
-        async with self._lock:
-            if download_id in self._subscribers:
-                try:
-                    self._subscribers[download_id].remove(queue)
-                    logger.info(f"📡 Subscriber removed from {download_id}")
-                except ValueError:
-                    pass
-    
+        state = self._downloads.get(download_id)
+        if state is not None:
+            async with state.lock:
+                # Hash-based removal — O(1) instead of scanning a list
+                state.subscribers.discard(queue)
+            logger.info("📡 Subscriber removed from %s", download_id)
+
     async def cleanup_old_downloads(self, max_age_hours: int = 24) -> int:
         """
         Remove tracking data for old downloads.
-        
+
         Args:
             max_age_hours: Maximum age in hours to keep completed downloads
-            
+
         Returns:
             Number of downloads cleaned up
         """
         async with self._lock:
-            now = datetime.now()
-            to_remove = []
-            
-            for download_id, start_time in self._start_times.items():
-                age_hours = (now - start_time).total_seconds() / 3600
-                if age_hours > max_age_hours and self._completed.get(download_id, False):
-                    to_remove.append(download_id)
-            
+            now = time.monotonic()
+            max_age_seconds = max_age_hours * 3600
+            to_remove = [
+                download_id
+                for download_id, state in self._downloads.items()
+                if state.completed and now - state.start_time > max_age_seconds
+            ]
+
             for download_id in to_remove:
-                # Clear all tracking data
-                self._progress.pop(download_id, None)
-                self._status.pop(download_id, None)
-                self._completed.pop(download_id, None)
-                self._errors.pop(download_id, None)
-                self._start_times.pop(download_id, None)
-                self._subscribers.pop(download_id, None)
-            
+                # One pop clears all tracking data for the download
+                self._downloads.pop(download_id, None)
+
             if to_remove:
-                logger.info(f"🧹 Cleaned up {len(to_remove)} old download(s)")
-            
+                logger.info("🧹 Cleaned up %s old download(s)", len(to_remove))
+
             return len(to_remove)
-    
+
     def get_active_downloads(self) -> List[str]:
         """Get list of active (non-completed) download IDs"""
         return [
-            download_id 
-            for download_id, completed in self._completed.items() 
-            if not completed
+            download_id
+            for download_id, state in self._downloads.items()
+            if not state.completed
         ]
-    
+
     def get_stats(self) -> Dict:
         """Get tracker statistics for monitoring"""
+        states = self._downloads.values()
         return {
-            'total_downloads': len(self._progress),
+            'total_downloads': len(self._downloads),
             'active_downloads': len(self.get_active_downloads()),
-            'completed_downloads': sum(1 for c in self._completed.values() if c),
-            'failed_downloads': len(self._errors),
-            'total_subscribers': sum(len(subs) for subs in self._subscribers.values())
+            'completed_downloads': sum(1 for s in states if s.completed),
+            'failed_downloads': sum(1 for s in states if s.error is not None),
+            'total_subscribers': sum(len(s.subscribers) for s in states)
         }
@@ -2,14 +2,27 @@
 Alternative YouTube downloader using pytubefix (works better than yt-dlp for some videos).
 """
 
+import asyncio
 import logging
+import threading
+import time
 from pathlib import Path
 from typing import Optional
+from cachetools import TTLCache
 from pytubefix import YouTube
 from pytubefix.cli import on_progress
 
 logger = logging.getLogger(__name__)
 
+# Constructing YouTube(url) fetches the watch page and runs signature
+# deciphering (1-3s). Cache the objects so preview -> download of the
+# same video pays that cost once. TTL stays well under the ~6h expiry
+# of the stream URLs pytubefix extracts. cachetools caches aren't
+# thread-safe and this one is hit from worker threads and the event
+# loop alike, so every access goes through the lock.
+_yt_cache: TTLCache = TTLCache(maxsize=512, ttl=3 * 3600)
+_yt_cache_lock = threading.Lock()
+
 
 class PyTubeDownloader:
     """
@@ -17,10 +30,32 @@ class PyTubeDownloader:
     More reliable than yt-dlp for some videos that return 403 errors.
     """
     
+    # Emit at most one progress update per this interval — pytubefix
+    # fires the hook on every chunk, far faster than SSE needs
+    PROGRESS_INTERVAL = 0.25
+
     def __init__(self):
         """Initialize PyTube downloader."""
         logger.info("✅ PyTube downloader initialized")
-    
+
+    @staticmethod
+    def _get_yt(youtube_url: str) -> YouTube:
+        """Get a YouTube object for the URL, reusing a cached one if fresh."""
+        with _yt_cache_lock:
+            yt = _yt_cache.get(youtube_url)
+        if yt is None:
+            yt = YouTube(youtube_url)
+            with _yt_cache_lock:
+                _yt_cache[youtube_url] = yt
+        return yt
+
+    @staticmethod
+    def _evict_yt(youtube_url: str) -> None:
+        """Drop a cached YouTube object so the next attempt re-deciphers."""
+        with _yt_cache_lock:
+            _yt_cache.pop(youtube_url, None)
+
+
     def download_audio(
         self,
         youtube_url: str,
@@ -41,18 +76,23 @@ class PyTubeDownloader:
             Path to downloaded file or None if failed
         """
         try:
-            logger.info(f"🎬 Downloading from YouTube (pytubefix): {youtube_url}")
-            
-            # Create YouTube object
-            yt = YouTube(
-                youtube_url,
-                on_progress_callback=lambda stream, chunk, bytes_remaining: 
-                    self._progress_hook(stream, chunk, bytes_remaining, progress_callback)
-                    if progress_callback else None
-            )
-            
-            logger.info(f"📺 Video: {yt.title}")
-            logger.info(f"⏱️  Duration: {yt.length}s")
+            logger.info("🎬 Downloading from YouTube (pytubefix): %s", youtube_url)
+            
+            # Progress hooks are registered on the YouTube object itself,
+            # so a cached (shared) object would cross-wire concurrent
+            # downloads of the same URL and keep the last hook attached
+            # for the cache TTL. With a callback, use a private object;
+            # only hook-less lookups go through the shared cache.
+            if progress_callback:
+                yt = YouTube(youtube_url)
+                yt.register_on_progress_callback(
+                    self._make_progress_hook(progress_callback)
+                )
+            else:
+                yt = self._get_yt(youtube_url)
+
+            logger.info("📺 Video: %s", yt.title)
+            logger.info("⏱️  Duration: %ss", yt.length)
             
             # Get audio stream (best quality)
             audio_stream = yt.streams.filter(
@@ -64,49 +104,104 @@ class PyTubeDownloader:
                 logger.error("❌ No audio stream available")
                 return None
             
-            logger.info(f"🎵 Audio stream: {audio_stream.abr} ({audio_stream.filesize / 1024 / 1024:.1f} MB)")
+            logger.info("🎵 Audio stream: %s (%.1f MB)", audio_stream.abr, audio_stream.filesize / 1024 / 1024)
             
             # Download
             output_path.mkdir(parents=True, exist_ok=True)
             
-            logger.info(f"📥 Downloading...")
+            logger.info("📥 Downloading...")
             downloaded_file = audio_stream.download(
                 output_path=str(output_path),
                 filename=f"{filename}.mp4"  # pytubefix adds extension
             )
             
             result_path = Path(downloaded_file)
-            logger.info(f"✅ Downloaded: {result_path.name}")
+            logger.info("✅ Downloaded: %s", result_path.name)
             
             return result_path
             
         except Exception as e:
-            logger.error(f"❌ PyTube download failed: {e}", exc_info=True)
+            self._evict_yt(youtube_url)
+            logger.error("❌ PyTube download failed: %s", e, exc_info=True)
             return None
-    
-    def _progress_hook(self, stream, chunk, bytes_remaining, callback):
+
+    async def download_audio_async(
+        self,
+        youtube_url: str,
+        output_path: Path,
+        filename: str,
+        progress_callback=None
+    ) -> Optional[Path]:
         """
-        Progress callback for pytubefix.
-        
+        Async wrapper around download_audio.
+
+        The pytubefix download is blocking HTTP, so it runs in a worker
+        thread to keep the event loop responsive for SSE progress and
+        other downloads. Note: progress_callback fires from the worker
+        thread — callers touching the event loop must marshal back via
+        asyncio.run_coroutine_threadsafe / loop.call_soon_threadsafe.
+
+        Args:
+            youtube_url: YouTube video URL
+            output_path: Directory to save the file
+            filename: Filename (without extension)
+            progress_callback: Optional callback for progress updates
+
+        Returns:
+            Path to downloaded file or None if failed
+        """
+        return await asyncio.to_thread(
+            self.download_audio,
+            youtube_url,
+            output_path,
+            filename,
+            progress_callback
+        )
+
+    def _make_progress_hook(self, callback):
+        """
+        Build a per-download pytubefix hook, debounced to whole-percent steps.
+
+        pytubefix fires the hook on every chunk; most calls round to the
+        same integer percent, so duplicates and sub-250ms bursts are
+        dropped before they reach the (cross-thread) user callback.
+        Debounce state lives in the closure — the downloader instance is
+        shared across concurrent downloads on different worker threads,
+        so instance fields would interleave their percents.
+
         Args:
-            stream: PyTube stream object
-            chunk: Downloaded chunk
-            bytes_remaining: Remaining bytes
-            callback: User callback
+            callback: User callback receiving (scaled_percent, message)
+
+        Returns:
+            Hook suitable for yt.register_on_progress_callback
         """
-        try:
-            total_size = stream.filesize
-            bytes_downloaded = total_size - bytes_remaining
-            percent = int((bytes_downloaded / total_size) * 100)
-            
-            # Map to 40-80% range (download phase in main workflow)
-            scaled_percent = 40 + int(percent * 0.4)
-            
-            if callback:
+        last_percent = -1
+        last_emit = 0.0
+
+        def hook(stream, chunk, bytes_remaining):
+            nonlocal last_percent, last_emit
+            try:
+                total_size = stream.filesize
+                bytes_downloaded = total_size - bytes_remaining
+                percent = bytes_downloaded * 100 // total_size
+
+                now = time.monotonic()
+                if percent == last_percent:
+                    return
+                if now - last_emit < self.PROGRESS_INTERVAL and percent < 100:
+                    return
+                last_percent = percent
+                last_emit = now
+
+                # Map to 40-80% range (download phase in main workflow)
+                scaled_percent = 40 + percent * 2 // 5
+
                 callback(scaled_percent, f"Downloading: {percent}%")
-                
-        except Exception as e:
-            logger.error(f"❌ Progress callback error: {e}")
+
+            except Exception as e:
+                logger.error("❌ Progress callback error: %s", e)
+
+        return hook
     
     async def get_audio_stream_url(self, youtube_url: str) -> Optional[str]:
         """
@@ -120,11 +215,11 @@ class PyTubeDownloader:
             Direct audio stream URL or None if failed
         """
         try:
-            logger.info(f"🔗 Extracting stream URL: {youtube_url}")
-            
-            # Create YouTube object
-            yt = YouTube(youtube_url)
+            logger.info("🔗 Extracting stream URL: %s", youtube_url)
             
+            # Create (or reuse) YouTube object
+            yt = self._get_yt(youtube_url)
+
             # Get best audio stream
             audio_stream = yt.streams.filter(
                 only_audio=True,
@@ -137,10 +232,11 @@ class PyTubeDownloader:
             
             # Get direct URL (expires after ~6 hours)
             stream_url = audio_stream.url
-            logger.info(f"✅ Stream URL extracted (expires in ~6 hours)")
+            logger.info("✅ Stream URL extracted (expires in ~6 hours)")
             
             return stream_url
             
         except Exception as e:
-            logger.error(f"❌ Failed to extract stream URL: {e}")
+            self._evict_yt(youtube_url)
+            logger.error("❌ Failed to extract stream URL: %s", e)
             return None
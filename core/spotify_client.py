@@ -5,14 +5,49 @@ Based on: spotify-downloader/spotdl/utils/spotify.py
 Simplified for server-side use (no user auth, caching handled separately).
 """
 
+import functools
 import logging
+import random
+import time
 from typing import Dict, Any, Optional, List
-from spotipy import Spotify
+from cachetools import LRUCache
+from spotipy import Spotify, SpotifyException
 from spotipy.oauth2 import SpotifyClientCredentials
 
 logger = logging.getLogger(__name__)
 
 
+def _retry_with_backoff(func):
+    """
+    Retry a Spotify call on 429, honoring Retry-After with jitter.
+
+    Spotify rate-limits on a rolling 30s window, so retrying the moment
+    the header allows — plus a little jitter so concurrent callers
+    don't stampede back in unison — beats spotipy's fixed backoff.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        delay = 1.0
+        for attempt in range(5):
+            try:
+                return func(*args, **kwargs)
+            except SpotifyException as e:
+                if e.http_status != 429 or attempt == 4:
+                    raise
+                try:
+                    retry_after = float((e.headers or {}).get('Retry-After', 0))
+                except (TypeError, ValueError):
+                    retry_after = 0.0
+                wait = max(retry_after, delay) + random.uniform(0, 0.5)
+                logger.warning(
+                    "⏳ Spotify 429, retrying in %.1fs (attempt %d/5)",
+                    wait, attempt + 1
+                )
+                time.sleep(wait)
+                delay = min(delay * 2, 30.0)
+    return wrapper
+
+
 class SpotifyClient:
     """
     Spotify API client for fetching track and album metadata.
@@ -39,11 +74,19 @@ class SpotifyClient:
         self.sp = Spotify(
             auth_manager=credential_manager,
             status_forcelist=(429, 500, 502, 503, 504),  # Retry on these status codes
-            retries=3
+            retries=5,
+            backoff_factor=0.5,
+            requests_timeout=10
         )
-        
+
+        # Track payloads are immutable, so a bounded LRU turns repeat
+        # lookups into dict hits — Spotify rate-limits on a rolling
+        # 30s window, so every saved call widens the headroom
+        self._track_cache: LRUCache = LRUCache(maxsize=1024)
+
         logger.info("✅ Spotify client initialized")
     
+    @_retry_with_backoff
     def get_track(self, track_id: str) -> Dict[str, Any]:
         """
         Fetch track metadata from Spotify API.
@@ -57,14 +100,63 @@ class SpotifyClient:
         Raises:
             Exception: If track not found or API error
         """
+        cached = self._track_cache.get(track_id)
+        if cached is not None:
+            return cached
+
         try:
             track = self.sp.track(track_id)
             logger.info(f"🎵 Fetched track: {track['name']} by {track['artists'][0]['name']}")
+            self._track_cache[track_id] = track
             return track
         except Exception as e:
             logger.error(f"❌ Failed to fetch track {track_id}: {e}")
             raise
     
+    @_retry_with_backoff
+    def get_tracks(self, track_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Fetch many tracks with batched API calls.
+
+        Spotify's /tracks endpoint accepts up to 50 IDs per request, so
+        a playlist resolves in one or two round trips instead of one
+        per track. Already-cached IDs are served without any request.
+
+        Args:
+            track_ids: Spotify track IDs
+
+        Returns:
+            List of track dictionaries, in input order
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for track_id in track_ids:
+            cached = self._track_cache.get(track_id)
+            if cached is not None:
+                results[track_id] = cached
+            elif track_id not in missing:
+                missing.append(track_id)
+
+        try:
+            for i in range(0, len(missing), 50):
+                chunk = missing[i:i + 50]
+                for track in self.sp.tracks(chunk)['tracks']:
+                    if track:
+                        self._track_cache[track['id']] = track
+                        results[track['id']] = track
+            if missing:
+                logger.info(
+                    "🎵 Fetched %d track(s) in %d batch request(s)",
+                    len(missing), (len(missing) + 49) // 50
+                )
+        except SpotifyException:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Failed to fetch track batch: {e}")
+            raise
+
+        return [results[tid] for tid in track_ids if tid in results]
+
     def get_album_art(self, track_id: str) -> Optional[str]:
         """
         Get highest quality album art URL (640x640 preferred).
@@ -77,24 +169,28 @@ class SpotifyClient:
         """
         try:
             track = self.get_track(track_id)
-            album = track.get('album', {})
-            images = album.get('images', [])
-            
-            if not images:
-                logger.warning(f"⚠️ No album art found for track {track_id}")
-                return None
-            
-            # Spotify returns images sorted by size (largest first)
-            # Prefer 640x640 (index 0) or 300x300 (index 1)
-            best_image = images[0]
-            url = best_image.get('url')
-            
-            logger.info(f"🖼️ Album art: {best_image.get('width')}x{best_image.get('height')} - {url}")
-            return url
-            
+            return self._extract_album_art(track)
+
         except Exception as e:
             logger.error(f"❌ Failed to get album art for {track_id}: {e}")
             return None
+
+    @staticmethod
+    def _extract_album_art(track: Dict[str, Any]) -> Optional[str]:
+        """Pull the best album art URL out of an already-fetched track."""
+        images = track.get('album', {}).get('images', [])
+
+        if not images:
+            logger.warning(f"⚠️ No album art found for track {track.get('id')}")
+            return None
+
+        # Spotify returns images sorted by size (largest first)
+        # Prefer 640x640 (index 0) or 300x300 (index 1)
+        best_image = images[0]
+        url = best_image.get('url')
+
+        logger.info(f"🖼️ Album art: {best_image.get('width')}x{best_image.get('height')} - {url}")
+        return url
     
     def get_track_metadata(self, track_id: str) -> Dict[str, Any]:
         """
@@ -144,7 +240,7 @@ class SpotifyClient:
                 'disc_number': track.get('disc_number', 1),
                 'isrc': track.get('external_ids', {}).get('isrc'),
                 'album_type': album.get('album_type', 'album'),
-                'album_art_url': self.get_album_art(track_id),
+                'album_art_url': self._extract_album_art(track),
                 'explicit': track.get('explicit', False),
                 'popularity': track.get('popularity', 0)
             }
@@ -156,6 +252,7 @@ class SpotifyClient:
             logger.error(f"❌ Failed to get metadata for {track_id}: {e}")
             raise
     
+    @_retry_with_backoff
     def get_album_metadata(self, album_id: str) -> Dict[str, Any]:
         """
         Get album metadata (useful for batch downloads).
@@ -8,13 +8,30 @@ Implements the same 200+ point scoring system for accurate track matching.
 
 import logging
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from typing import Optional, Dict, Any, List
+from cachetools import TTLCache
+from rapidfuzz import fuzz
 from yt_dlp import YoutubeDL
 from ytmusicapi import YTMusic
-import difflib
 
 logger = logging.getLogger(__name__)
 
+# YTMusic responses keyed by (query, filter, limit) — the three passes
+# often repeat queries (track-only vs reversed), and users re-search
+# the same track on retries. Locked because passes run in threads.
+_search_cache: TTLCache = TTLCache(maxsize=4096, ttl=3600)
+_search_cache_lock = threading.Lock()
+
+# Query-cleanup patterns, compiled once — _build_search_query runs
+# three times per search request
+_FEAT_RE = re.compile(r'\((?:feat\.|ft\.|featuring).*?\)', re.IGNORECASE)
+_BRACKET_RE = re.compile(r'\[.*?\]')
+_PAREN_RE = re.compile(r'\(.*?\)')
+_WS_RE = re.compile(r'\s+')
+
 
 class YouTubeMusicSearcher:
     """
@@ -85,10 +102,10 @@ class YouTubeMusicSearcher:
             or None if no suitable match found
         """
         try:
-            logger.debug(f"🔍 Multi-pass search starting")
-            logger.debug(f"   Track: {track_name}")
-            logger.debug(f"   Artist: {artist_name}")
-            logger.debug(f"   Duration: {duration_seconds}s")
+            logger.debug("🔍 Multi-pass search starting")
+            logger.debug("   Track: %s", track_name)
+            logger.debug("   Artist: %s", artist_name)
+            logger.debug("   Duration: %ss", duration_seconds)
             
             # HIGH CONFIDENCE THRESHOLD - stop searching if reached
             HIGH_CONFIDENCE = 180
@@ -97,87 +114,67 @@ class YouTubeMusicSearcher:
             opts = self.ydl_opts.copy()
             if proxy:
                 opts['proxy'] = proxy
-                logger.info(f"🔄 Using proxy: {proxy}")
+                logger.info("🔄 Using proxy: %s", proxy)
             
-            ytmusic = YTMusic()
             best_overall = None
-            
-            # === PASS 1: Track name only ===
-            logger.debug(f"\n{'='*60}")
-            logger.debug(f"🎯 PASS 1: Track name only")
-            logger.debug(f"{'='*60}")
-            query1 = self._build_search_query(track_name, "")
-            logger.debug(f"🔍 Query: {query1}")
-            
-            best_pass1 = self._search_with_query(
-                ytmusic, query1, track_name, artist_name, duration_seconds, max_results
-            )
-            
-            if best_pass1:
-                logger.debug(f"✅ Pass 1 best: {best_pass1['title']} (score: {best_pass1['score']})")
-                best_overall = best_pass1
-                
-                if best_pass1['score'] >= HIGH_CONFIDENCE:
-                    logger.info(f"🏆 HIGH CONFIDENCE match found (>= {HIGH_CONFIDENCE})! Stopping search.")
-                    return best_pass1
-            else:
-                logger.debug("❌ Pass 1: No matches")
-            
-            # === PASS 2: Track + Artist ===
-            logger.debug(f"\n{'='*60}")
-            logger.debug(f"🎯 PASS 2: Track + Artist")
-            logger.debug(f"{'='*60}")
-            query2 = self._build_search_query(track_name, artist_name)
-            logger.debug(f"🔍 Query: {query2}")
-            
-            best_pass2 = self._search_with_query(
-                ytmusic, query2, track_name, artist_name, duration_seconds, max_results
-            )
-            
-            if best_pass2:
-                logger.debug(f"✅ Pass 2 best: {best_pass2['title']} (score: {best_pass2['score']})")
-                if not best_overall or best_pass2['score'] > best_overall['score']:
-                    best_overall = best_pass2
-                
-                if best_pass2['score'] >= HIGH_CONFIDENCE:
-                    logger.info(f"🏆 HIGH CONFIDENCE match found (>= {HIGH_CONFIDENCE})! Stopping search.")
-                    return best_pass2
-            else:
-                logger.debug("❌ Pass 2: No matches")
-            
-            # === PASS 3: Artist + Track (reversed) ===
-            logger.debug(f"\n{'='*60}")
-            logger.debug(f"🎯 PASS 3: Artist + Track (reversed)")
-            logger.debug(f"{'='*60}")
-            query3 = self._build_search_query(artist_name, track_name)  # Reversed!
-            logger.debug(f"🔍 Query: {query3}")
-            
-            best_pass3 = self._search_with_query(
-                ytmusic, query3, track_name, artist_name, duration_seconds, max_results
-            )
-            
-            if best_pass3:
-                logger.debug(f"✅ Pass 3 best: {best_pass3['title']} (score: {best_pass3['score']})")
-                if not best_overall or best_pass3['score'] > best_overall['score']:
-                    best_overall = best_pass3
-            else:
-                logger.debug("❌ Pass 3: No matches")
-            
+
+            # The three passes are independent network-bound searches,
+            # so run them concurrently and take results as they land
+            passes = [
+                ("PASS 1: Track name only", self._build_search_query(track_name, "")),
+                ("PASS 2: Track + Artist", self._build_search_query(track_name, artist_name)),
+                ("PASS 3: Artist + Track (reversed)", self._build_search_query(artist_name, track_name)),
+            ]
+
+            # No `with` block: the context manager's exit joins worker
+            # threads, which would make the early return below wait for
+            # the slower passes anyway
+            pool = ThreadPoolExecutor(max_workers=len(passes))
+            try:
+                futures = {}
+                for label, query in passes:
+                    logger.debug("🎯 %s — query: %s", label, query)
+                    future = pool.submit(
+                        self._search_with_query,
+                        query, track_name, artist_name,
+                        duration_seconds, max_results
+                    )
+                    futures[future] = label
+
+                for future in as_completed(futures):
+                    label = futures[future]
+                    best_pass = future.result()
+
+                    if not best_pass:
+                        logger.debug("❌ %s: No matches", label)
+                        continue
+
+                    logger.debug("✅ %s best: %s (score: %s)", label, best_pass['title'], best_pass['score'])
+                    if not best_overall or best_pass['score'] > best_overall['score']:
+                        best_overall = best_pass
+
+                    if best_pass['score'] >= HIGH_CONFIDENCE:
+                        logger.info("🏆 HIGH CONFIDENCE match found (>= %s)! Stopping search.", HIGH_CONFIDENCE)
+                        return best_pass
+            finally:
+                # Drop queued passes and return without joining running
+                # ones — they finish (and fill the cache) in the background
+                pool.shutdown(wait=False, cancel_futures=True)
+
             # === FINAL RESULT ===
             if best_overall:
-                logger.info(f"✅ Found: {best_overall['title']} (score: {best_overall['score']}/200+)")
+                logger.info("✅ Found: %s (score: %s/200+)", best_overall['title'], best_overall['score'])
                 return best_overall
             else:
                 logger.warning("❌ No suitable matches found across all passes")
                 return None
                 
         except Exception as e:
-            logger.error(f"❌ YouTube search error: {e}", exc_info=True)
+            logger.error("❌ YouTube search error: %s", e, exc_info=True)
             return None
     
     def _search_with_query(
         self,
-        ytmusic: YTMusic,
         query: str,
         track_name: str,
         artist_name: str,
@@ -186,124 +183,41 @@ class YouTubeMusicSearcher:
     ) -> Optional[Dict[str, Any]]:
         """
         Execute a single search pass with the given query.
-        
+
         Tries multiple filters to find the track:
         1. 'songs' - Official YouTube Music tracks
         2. No filter (None) - All results including uploads
-        
+
         Args:
-            ytmusic: YTMusic instance
             query: Search query string
             track_name: Original track name for scoring
             artist_name: Original artist name for scoring
             duration_seconds: Expected duration
             max_results: Max results to fetch
-            
+
         Returns:
             Best match from this pass or None
         """
         try:
             all_videos = []
-            
-            # Try 'songs' filter first (official tracks)
-            logger.debug(f"   🔍 Searching 'songs' filter...")
-            try:
-                search_results = ytmusic.search(query, filter='songs', limit=max_results)
-                logger.debug(f"   📋 'songs' filter: {len(search_results)} results")
-                
-                for result in search_results:
-                    video_id = result.get('videoId')
-                    if not video_id:
-                        continue
-                    
-                    video_url = f"https://music.youtube.com/watch?v={video_id}"
-                    
-                    video_info = {
-                        'id': video_id,
-                        'title': result.get('title', ''),
-                        'duration': result.get('duration_seconds', 0),
-                        'uploader': result.get('artists', [{}])[0].get('name', '') if result.get('artists') else '',
-                        'view_count': 0,
-                        'url': video_url,
-                        'webpage_url': video_url,
-                    }
-                    all_videos.append(video_info)
-            except Exception as e:
-                logger.warning(f"   ⚠️ 'songs' filter failed: {e}")
-            
-            # Try 'videos' filter (includes uploads, user content)
-            logger.debug(f"   🔍 Searching 'videos' filter...")
-            try:
-                video_results = ytmusic.search(query, filter='videos', limit=max_results)
-                logger.debug(f"   📋 'videos' filter: {len(video_results)} results")
-                
-                for result in video_results:
-                    video_id = result.get('videoId')
-                    if not video_id:
-                        continue
-                    
-                    # Skip duplicates
-                    if any(v['id'] == video_id for v in all_videos):
-                        continue
-                    
-                    video_url = f"https://music.youtube.com/watch?v={video_id}"
-                    
-                    # For videos, artist info is in different structure
-                    artists = result.get('artists', [])
-                    uploader = artists[0].get('name', '') if artists else ''
-                    
-                    video_info = {
-                        'id': video_id,
-                        'title': result.get('title', ''),
-                        'duration': result.get('duration_seconds', 0),
-                        'uploader': uploader,
-                        'view_count': 0,
-                        'url': video_url,
-                        'webpage_url': video_url,
-                    }
-                    all_videos.append(video_info)
-            except Exception as e:
-                logger.warning(f"   ⚠️ 'videos' filter failed: {e}")
-            
-            # Try no filter (all categories)
-            logger.debug(f"   🔍 Searching without filter (all categories)...")
-            try:
-                all_results = ytmusic.search(query, limit=max_results)
-                logger.debug(f"   📋 No filter: {len(all_results)} results")
-                
-                for result in all_results:
-                    video_id = result.get('videoId')
-                    if not video_id:
-                        continue
-                    
-                    # Skip duplicates
-                    if any(v['id'] == video_id for v in all_videos):
-                        continue
-                    
-                    video_url = f"https://music.youtube.com/watch?v={video_id}"
-                    
-                    # Handle different result types
-                    artists = result.get('artists', [])
-                    uploader = artists[0].get('name', '') if artists else ''
-                    
-                    video_info = {
-                        'id': video_id,
-                        'title': result.get('title', ''),
-                        'duration': result.get('duration_seconds', 0),
-                        'uploader': uploader,
-                        'view_count': 0,
-                        'url': video_url,
-                        'webpage_url': video_url,
-                    }
-                    all_videos.append(video_info)
-            except Exception as e:
-                logger.warning(f"   ⚠️ No filter search failed: {e}")
-            
+            seen_ids = set()
+
+            # Fire the three filter searches concurrently; results are
+            # still merged in filter order so 'songs' keeps priority
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                songs_future = pool.submit(self._cached_search, query, 'songs', max_results)
+                videos_future = pool.submit(self._cached_search, query, 'videos', max_results)
+                nofilter_future = pool.submit(self._cached_search, query, None, max_results)
+
+            self._collect(songs_future, "'songs' filter", all_videos, seen_ids)
+            self._collect(videos_future, "'videos' filter", all_videos, seen_ids)
+            self._collect(nofilter_future, "no filter", all_videos, seen_ids)
+
             if not all_videos:
-                logger.warning(f"   ❌ No results from any filter")
+                logger.warning("   ❌ No results from any filter")
                 return None
             
-            logger.debug(f"📋 Total unique results: {len(all_videos)}")
+            logger.debug("📋 Total unique results: %s", len(all_videos))
             
             # Find best match using scoring algorithm
             best_match = self._find_best_match(
@@ -316,9 +230,82 @@ class YouTubeMusicSearcher:
             return best_match
             
         except Exception as e:
-            logger.error(f"❌ Search pass error: {e}", exc_info=True)
+            logger.error("❌ Search pass error: %s", e, exc_info=True)
             return None
-    
+
+    @staticmethod
+    def _cached_search(
+        query: str,
+        filter_: Optional[str],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """
+        ytmusic.search with a shared TTL cache in front.
+
+        Identical queries across passes, retries, and repeat requests
+        for the same track hit memory instead of the network. Each miss
+        gets its own YTMusic client — the underlying requests.Session is
+        not thread-safe, and these calls run on pool threads.
+        """
+        key = (query, filter_, limit)
+        with _search_cache_lock:
+            cached = _search_cache.get(key)
+        if cached is not None:
+            logger.debug("   💾 Search cache hit: %r (filter=%s)", query, filter_)
+            return cached
+
+        results = YTMusic().search(query, filter=filter_, limit=limit)
+        with _search_cache_lock:
+            _search_cache[key] = results
+        return results
+
+    def _collect(
+        self,
+        future,
+        filter_label: str,
+        all_videos: List[Dict[str, Any]],
+        seen_ids: set
+    ) -> None:
+        """
+        Append one filter search's results to all_videos.
+
+        Duplicates across filters are skipped via the shared seen_ids
+        set — an O(1) membership check instead of rescanning the list
+        for every candidate.
+
+        Args:
+            future: Future holding the ytmusic.search results
+            filter_label: Human-readable filter name for logs
+            all_videos: Accumulator list shared across filters
+            seen_ids: Video IDs already collected
+        """
+        logger.debug("   🔍 Collecting %s results...", filter_label)
+        try:
+            search_results = future.result()
+            logger.debug("   📋 %s: %s results", filter_label, len(search_results))
+
+            for result in search_results:
+                video_id = result.get('videoId')
+                if not video_id or video_id in seen_ids:
+                    continue
+                seen_ids.add(video_id)
+
+                video_url = f"https://music.youtube.com/watch?v={video_id}"
+                artists = result.get('artists', [])
+                uploader = artists[0].get('name', '') if artists else ''
+
+                all_videos.append({
+                    'id': video_id,
+                    'title': result.get('title', ''),
+                    'duration': result.get('duration_seconds', 0),
+                    'uploader': uploader,
+                    'view_count': 0,
+                    'url': video_url,
+                    'webpage_url': video_url,
+                })
+        except Exception as e:
+            logger.warning("   ⚠️ %s search failed: %s", filter_label, e)
+
     def _build_search_query(self, track: str, artist: str) -> str:
         """
         Build search query from track and artist names.
@@ -332,20 +319,16 @@ class YouTubeMusicSearcher:
             Cleaned search query
         """
         query = f"{track} {artist}".strip()
-        
+
         # Remove features (feat., ft., featuring)
-        query = re.sub(r'\(feat\..*?\)', '', query, flags=re.IGNORECASE)
-        query = re.sub(r'\(ft\..*?\)', '', query, flags=re.IGNORECASE)
-        query = re.sub(r'\(featuring.*?\)', '', query, flags=re.IGNORECASE)
-        
+        query = _FEAT_RE.sub('', query)
+
         # Remove brackets and extra content
-        query = re.sub(r'\[.*?\]', '', query)
-        query = re.sub(r'\(.*?\)', '', query)
-        
+        query = _BRACKET_RE.sub('', query)
+        query = _PAREN_RE.sub('', query)
+
         # Clean whitespace
-        query = ' '.join(query.split())
-        
-        return query
+        return _WS_RE.sub(' ', query).strip()
     
     def _find_best_match(
         self,
@@ -368,34 +351,47 @@ class YouTubeMusicSearcher:
         """
         # Keywords for preferred results
         good_words = ['lyrics', 'lyric video', 'audio', 'official audio']
-        
+
+        # Penalty for wrong versions/remixes
+        bad_keywords = [
+            'sing-along', 'sing along', 'singalong',
+            'karaoke', 'instrumental', 'remix',
+            'cover', 'nightcore', 'slowed', 'reverb',
+            '8d audio', 'bass boost', 'sped up'
+        ]
+
+        # Loop invariants: lowercase/tokenize the wanted track once
+        # instead of once per candidate video
+        track_lower = track_name.lower()
+        artist_lower = artist_name.lower()
+        track_words = [w for w in track_lower.split() if len(w) > 2]
+        track_words_len = len(track_words)
+
         scored_videos = []
-        
+
         for video in videos:
             title = video.get('title', '').lower()
-            track_lower = track_name.lower()
-            artist_lower = artist_name.lower()
             score = 0
-            
-            logger.debug(f"🎵 Scoring: {video.get('title')[:80]}")
-            logger.debug(f"   Uploader: {video.get('uploader', 'Unknown')}")
-            logger.debug(f"   Duration: {video.get('duration', 0)}s (expected: {expected_duration}s)")
+
+            logger.debug("🎵 Scoring: %.80s", video.get('title'))
+            logger.debug("   Uploader: %s", video.get('uploader', 'Unknown'))
+            logger.debug("   Duration: %ss (expected: %ss)", video.get('duration', 0), expected_duration)
             
             # === STRATEGY 1: KEYWORD-BASED SCORING ===
             
-            # Track word match (REQUIRED 50%+)
-            track_words = [w for w in track_lower.split() if len(w) > 2]
+            # Track word match (REQUIRED 50%+) — substring checks, so a
+            # word glued to punctuation ("brightside)") still counts
             if track_words:
                 matched_words = sum(1 for word in track_words if word in title)
-                match_percent = matched_words / len(track_words)
-                
+                match_percent = matched_words / track_words_len
+
                 if match_percent < 0.5:
                     score -= 100  # Massive penalty - likely wrong song
-                    logger.debug(f"   ❌ Track match: {int(match_percent * 100)}% -> PENALTY -100")
+                    logger.debug("   ❌ Track match: %s%% -> PENALTY -100", int(match_percent * 100))
                 else:
                     match_bonus = int(match_percent * 50)
                     score += match_bonus
-                    logger.debug(f"   ✅ Track match: {int(match_percent * 100)}% -> +{match_bonus}")
+                    logger.debug("   ✅ Track match: %s%% -> +%s", int(match_percent * 100), match_bonus)
             
             # Artist name presence
             uploader = video.get('uploader', '').lower()
@@ -421,7 +417,7 @@ class YouTubeMusicSearcher:
                     duration_score = -10  # Likely extended/loop
                 
                 score += duration_score
-                logger.debug(f"   ⏱️ Duration diff: {duration_diff}s -> {'+' if duration_score > 0 else ''}{duration_score}")
+                logger.debug("   ⏱️ Duration diff: %ss -> %s%s", duration_diff, '+' if duration_score > 0 else '', duration_score)
             
             # View count (quality indicator)
             view_count = video.get('view_count', 0) or 0
@@ -438,13 +434,13 @@ class YouTubeMusicSearcher:
             
             score += view_score
             if view_count > 0:
-                logger.debug(f"   👁️ Views: {view_count:,} -> {'+' if view_score > 0 else ''}{view_score}")
+                logger.debug("   👁️ Views: %s -> %+d", view_count, view_score)
             
             # Title keywords (lyrics/audio)
             for word in good_words:
                 if word in title:
                     score += 15
-                    logger.debug(f"   Found '{word}' -> +15")
+                    logger.debug("   Found '%s' -> +15", word)
                     break
             
             # Official (non-video)
@@ -452,38 +448,39 @@ class YouTubeMusicSearcher:
                 score += 10
                 logger.debug("   Official (non-video) -> +10")
             
+            # === STRATEGY 3: KEYWORD PENALTIES (NEW - from original working algorithm) ===
+            # Applied before similarity so hopeless candidates can skip it
+
+            for keyword in bad_keywords:
+                if keyword in title:
+                    score -= 50
+                    logger.debug("   ⚠️ Keyword penalty '%s' -> -50", keyword)
+
             # === STRATEGY 2: SIMILARITY-BASED SCORING ===
-            
+
+            # Similarity can add at most +80 (title 50 + artist 30); if
+            # even that can't reach the 100 threshold, skip the edit-
+            # distance work — a -100 track-word penalty plus one bad
+            # keyword is already mathematically out
+            if score + 80 < 100:
+                logger.debug("   ⏭️ Upper bound %s < 100, skipping similarity", score + 80)
+                continue
+
             # Title similarity (up to +50 points)
             title_similarity = self._calculate_similarity(track_lower, title)
             title_score = int(title_similarity * 50)
             score += title_score
-            logger.debug(f"   🔤 Title similarity: {int(title_similarity * 100)}% -> +{title_score}")
-            
+            logger.debug("   🔤 Title similarity: %s%% -> +%s", int(title_similarity * 100), title_score)
+
             # Artist similarity (up to +30 points)
             artist_in_uploader = self._calculate_similarity(artist_lower, uploader)
             artist_in_title = self._calculate_similarity(artist_lower, title)
             artist_similarity = max(artist_in_uploader, artist_in_title)
             artist_score = int(artist_similarity * 30)
             score += artist_score
-            logger.debug(f"   👤 Artist similarity: {int(artist_similarity * 100)}% -> +{artist_score}")
-            
-            # === STRATEGY 3: KEYWORD PENALTIES (NEW - from original working algorithm) ===
-            
-            # Penalty for wrong versions/remixes
-            bad_keywords = [
-                'sing-along', 'sing along', 'singalong',
-                'karaoke', 'instrumental', 'remix',
-                'cover', 'nightcore', 'slowed', 'reverb',
-                '8d audio', 'bass boost', 'sped up'
-            ]
-            
-            for keyword in bad_keywords:
-                if keyword in title:
-                    score -= 50
-                    logger.debug(f"   ⚠️ Keyword penalty '{keyword}' -> -50")
-            
-            logger.debug(f"   📊 TOTAL SCORE: {score}")
+            logger.debug("   👤 Artist similarity: %s%% -> +%s", int(artist_similarity * 100), artist_score)
+
+            logger.debug("   📊 TOTAL SCORE: %s", score)
             
             # Only consider if score >= 100 (STRICT minimum threshold)
             if score >= 100:
@@ -503,35 +500,49 @@ class YouTubeMusicSearcher:
         
         # Return highest scoring video
         best = max(scored_videos, key=lambda x: x['score'])
-        logger.debug(f"🏆 Best match: {best['title']} (score: {best['score']})")
+        logger.debug("🏆 Best match: %s (score: %s)", best['title'], best['score'])
         
         return best
     
     def _calculate_similarity(self, str1: str, str2: str) -> float:
         """
         Calculate similarity between two strings (0.0 to 1.0).
-        Uses SequenceMatcher for Levenshtein-like similarity.
-        
+        Falls back to RapidFuzz's bit-parallel Levenshtein ratio.
+
+        Callers pass already-lowercased strings. Memoized — the same
+        (track, title) and (artist, uploader) pairs recur whenever the
+        three passes surface the same video.
+
         Args:
             str1: First string
             str2: Second string
-            
+
         Returns:
             Similarity ratio between 0.0 and 1.0
         """
-        if str1 == str2:
-            return 1.0
-        if str1 in str2 or str2 in str1:
-            return 0.8
-        
-        # Word overlap
-        words1 = set(str1.split())
-        words2 = set(str2.split())
-        if words1 and words2:
-            intersection = len(words1 & words2)
-            union = len(words1 | words2)
-            if union > 0:
-                return intersection / union
-        
-        # Fallback to sequence matcher
-        return difflib.SequenceMatcher(None, str1.lower(), str2.lower()).ratio()
+        # Every branch below is symmetric, so canonicalize the pair
+        # order and let sim(a, b) share a cache slot with sim(b, a)
+        if str1 <= str2:
+            return _similarity(str1, str2)
+        return _similarity(str2, str1)
+
+
+@lru_cache(maxsize=2048)
+def _similarity(str1: str, str2: str) -> float:
+    """Cached similarity kernel for _calculate_similarity."""
+    if str1 == str2:
+        return 1.0
+    if str1 in str2 or str2 in str1:
+        return 0.8
+
+    # Word overlap
+    words1 = set(str1.split())
+    words2 = set(str2.split())
+    if words1 and words2:
+        intersection = len(words1 & words2)
+        union = len(words1 | words2)
+        if union > 0:
+            return intersection / union
+
+    # Fallback to edit-distance ratio (C-speed, not pure Python)
+    return fuzz.ratio(str1, str2) / 100.0
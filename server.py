@@ -115,6 +115,52 @@ async def cache_download(spotify_track_id: str, file_path: Path):
     logger.info(f"📦 Cached download for {spotify_track_id}")
 
 
+async def convert_to_m4a(audio_file: Path) -> Path:
+    """
+    Remux an MP4 container to M4A without blocking the event loop.
+
+    When the audio stream is already AAC (the usual case for YouTube
+    audio-only streams), M4A and MP4 share the same container, so a
+    plain rename suffices — no process fork, no bytes rewritten. Only
+    non-AAC streams go through ffmpeg (stream copy, no re-encode).
+    Returns the new path on success, or the original file if
+    conversion fails.
+    """
+    m4a_file = audio_file.with_suffix('.m4a')
+
+    try:
+        probe = await asyncio.create_subprocess_exec(
+            'ffprobe', '-v', 'error', '-select_streams', 'a:0',
+            '-show_entries', 'stream=codec_name', '-of', 'csv=p=0',
+            str(audio_file),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        stdout, _ = await probe.communicate()
+        if probe.returncode == 0 and stdout.decode().strip() == 'aac':
+            audio_file.rename(m4a_file)
+            logger.info(f"✅ Renamed to M4A (AAC stream, no remux needed): {m4a_file.name}")
+            return m4a_file
+    except Exception as e:
+        logger.debug(f"ffprobe codec check failed, falling back to remux: {e}")
+
+    proc = await asyncio.create_subprocess_exec(
+        'ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostdin',
+        '-i', str(audio_file), '-c', 'copy', '-y', str(m4a_file),
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE
+    )
+    _, stderr = await proc.communicate()
+
+    if proc.returncode == 0 and m4a_file.exists():
+        audio_file.unlink()  # Delete MP4
+        logger.info(f"✅ Converted to M4A: {m4a_file.name}")
+        return m4a_file
+
+    logger.warning(f"⚠️ FFmpeg conversion failed, keeping MP4: {stderr.decode(errors='replace').strip()}")
+    return audio_file
+
+
 # ============================================================================
 # Request/Response Models
 # ============================================================================
@@ -312,13 +358,20 @@ async def _download_task(
         temp_output = OUTPUT_DIR / f"temp_{download_id}"
         temp_output.mkdir(exist_ok=True)
         
-        # Create progress callback wrapper
+        # Create progress callback wrapper (called from the download worker
+        # thread, so updates must be marshalled back onto the event loop)
+        loop = asyncio.get_running_loop()
+
         def download_progress(percent, message):
-            loop = asyncio.get_event_loop()
-            loop.create_task(progress_tracker.set_progress(download_id, percent, message))
-        
+            asyncio.run_coroutine_threadsafe(
+                progress_tracker.set_progress(download_id, percent, message),
+                loop
+            )
+
         # Use downloader's _download_audio which has pytubefix + yt-dlp fallbacks
-        audio_file = track_downloader._download_audio(
+        # (runs in a worker thread so the event loop keeps serving requests)
+        audio_file = await asyncio.to_thread(
+            track_downloader._download_audio,
             youtube_url,
             f"{metadata['title']}",
             metadata['artists'][0],
@@ -331,24 +384,10 @@ async def _download_task(
         await progress_tracker.set_progress(download_id, 70, f"Downloaded: {audio_file.name}")
         logger.info(f"📦 Downloaded: {audio_file.name} ({audio_file.stat().st_size:,} bytes)")
         
-        # Step 7: Convert MP4 to M4A if needed
+        # Step 7: Convert MP4 to M4A if needed (async subprocess, non-blocking)
         if audio_file.suffix.lower() == '.mp4':
             await progress_tracker.set_progress(download_id, 72, "Converting MP4 to M4A...")
-            import subprocess
-            
-            m4a_file = audio_file.with_suffix('.m4a')
-            result = subprocess.run(
-                ['ffmpeg', '-i', str(audio_file), '-c', 'copy', '-y', str(m4a_file)],
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode == 0 and m4a_file.exists():
-                audio_file.unlink()  # Delete MP4
-                audio_file = m4a_file
-                logger.info(f"✅ Converted to M4A: {m4a_file.name}")
-            else:
-                logger.warning(f"⚠️ FFmpeg conversion failed, keeping MP4")
+            audio_file = await convert_to_m4a(audio_file)
         
         await progress_tracker.set_progress(download_id, 75, "Fetching lyrics...")
         
@@ -565,11 +604,19 @@ async def _download_custom_url_task(
         temp_output = OUTPUT_DIR / f"temp_{download_id}"
         temp_output.mkdir(exist_ok=True)
         
+        # Progress callback fires from the download worker thread, so
+        # updates must be marshalled back onto the event loop
+        loop = asyncio.get_running_loop()
+
         def download_progress(percent, message):
-            loop = asyncio.get_event_loop()
-            loop.create_task(progress_tracker.set_progress(download_id, percent, message))
-        
-        audio_file = pytube_downloader.download_audio(
+            asyncio.run_coroutine_threadsafe(
+                progress_tracker.set_progress(download_id, percent, message),
+                loop
+            )
+
+        # Runs in a worker thread — the event loop keeps serving SSE
+        # progress and other downloads during the transfer
+        audio_file = await pytube_downloader.download_audio_async(
             youtube_url,
             temp_output,
             f"{metadata['title']} - {metadata['artists'][0]}",
@@ -581,20 +628,10 @@ async def _download_custom_url_task(
         
         await progress_tracker.set_progress(download_id, 70, f"Downloaded: {audio_file.name}")
         
-        # Step 3: Convert to M4A if needed
+        # Step 3: Convert to M4A if needed (async subprocess, non-blocking)
         if audio_file.suffix.lower() == '.mp4':
             await progress_tracker.set_progress(download_id, 72, "Converting to M4A...")
-            import subprocess
-            
-            m4a_file = audio_file.with_suffix('.m4a')
-            result = subprocess.run(
-                ['ffmpeg', '-i', str(audio_file), '-c', 'copy', '-y', str(m4a_file)],
-                capture_output=True
-            )
-            
-            if result.returncode == 0 and m4a_file.exists():
-                audio_file.unlink()
-                audio_file = m4a_file
+            audio_file = await convert_to_m4a(audio_file)
         
         await progress_tracker.set_progress(download_id, 75, "Writing metadata...")
         
@@ -1022,7 +1059,7 @@ async def startup_event():
     logger.info(f"📦 Download cache duration: 24 hours")
     
     # Initialize async enrichment services
-    lyrics_fetcher = LyricsFetcher(genius_token=GENIUS_TOKEN)
+    lyrics_fetcher = await LyricsFetcher.create(genius_token=GENIUS_TOKEN)
     deezer = DeezerEnrichment()
     musicbrainz = MusicBrainzEnrichment()
     lastfm = LastFmEnrichment()
@@ -23,7 +23,7 @@ async def test_download():
     youtube = YouTubeMusicSearcher()
     pytube = PyTubeDownloader()
     metadata_writer = MetadataWriter()
-    lyrics_fetcher = LyricsFetcher(genius_token=GENIUS_TOKEN)
+    lyrics_fetcher = await LyricsFetcher.create(genius_token=GENIUS_TOKEN)
     deezer = DeezerEnrichment()
     musicbrainz = MusicBrainzEnrichment()
     lastfm = LastFmEnrichment()
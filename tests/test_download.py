@@ -1,5 +1,6 @@
 """Test complete download workflow."""
 
+import asyncio
 import sys
 import os
 
@@ -45,11 +46,11 @@ def test_download():
     print(f"\n📥 Downloading track: {track_id}")
     print("-" * 60)
     
-    result = downloader.download_track(
+    result = asyncio.run(downloader.download_track(
         track_id=track_id,
         progress_callback=progress_callback,
         include_lyrics=True
-    )
+    ))
     
     if result:
         print("\n" + "="*60)
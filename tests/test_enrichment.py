@@ -69,7 +69,7 @@ async def test_lyrics_fetcher():
     print("TESTING LYRICS FETCHER")
     print("="*60)
     
-    fetcher = LyricsFetcher()
+    fetcher = await LyricsFetcher.create()
     
     # Test track: Mr. Brightside by The Killers
     track = "Mr. Brightside"